@@ -0,0 +1,34 @@
+"""llm cache
+
+Revision ID: 0f6b2d9c4e81
+Revises: 5e9a0c3d7b16
+Create Date: 2026-10-15 14:32:07.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f6b2d9c4e81'
+down_revision: Union[str, Sequence[str], None] = '5e9a0c3d7b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_cache',
+    sa.Column('cache_key', sa.String(length=160), nullable=False),
+    sa.Column('output', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('llm_cache')
@@ -0,0 +1,41 @@
+"""user preference indexes
+
+Revision ID: 3b8e1c4d9f20
+Revises: 67fc2922fb3c
+Create Date: 2026-10-15 09:12:41.208355
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e1c4d9f20'
+down_revision: Union[str, Sequence[str], None] = '67fc2922fb3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('users', 'preferences',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               postgresql_using='preferences::jsonb')
+    op.create_index('ix_users_is_active', 'users', ['is_active'], unique=False)
+    op.create_index('ix_users_preferences', 'users', ['preferences'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_preferences', table_name='users', postgresql_using='gin')
+    op.drop_index('ix_users_is_active', table_name='users')
+    op.alter_column('users', 'preferences',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.JSON(),
+               existing_nullable=False,
+               postgresql_using='preferences::json')
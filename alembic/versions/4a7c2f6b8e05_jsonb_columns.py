@@ -0,0 +1,56 @@
+"""jsonb columns
+
+Revision ID: 4a7c2f6b8e05
+Revises: e27b5d8c6a19
+Create Date: 2026-10-15 12:02:33.671458
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7c2f6b8e05'
+down_revision: Union[str, Sequence[str], None] = 'e27b5d8c6a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, nullable) converted from JSON to JSONB
+JSONB_COLUMNS = [
+    ('career_pages', 'scrape_config', True),
+    ('job_postings', 'raw_data', False),
+    ('raw_page_contents', 'data', False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, nullable in JSONB_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=sa.JSON(),
+                   type_=postgresql.JSONB(astext_type=sa.Text()),
+                   existing_nullable=nullable,
+                   server_default=sa.text("'{}'::jsonb"),
+                   postgresql_using=f'{column}::jsonb')
+    op.alter_column('users', 'preferences',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               server_default=sa.text("'{}'::jsonb"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('users', 'preferences',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               server_default=None)
+    for table, column, nullable in JSONB_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                   type_=sa.JSON(),
+                   existing_nullable=nullable,
+                   server_default=None,
+                   postgresql_using=f'{column}::json')
@@ -0,0 +1,61 @@
+"""xxhash external ids
+
+Revision ID: 5e9a0c3d7b16
+Revises: b81d3e7f5a42
+Create Date: 2026-10-15 14:05:52.310927
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import xxhash
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9a0c3d7b16'
+down_revision: Union[str, Sequence[str], None] = 'b81d3e7f5a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+job_postings = sa.table(
+    'job_postings',
+    sa.column('id'),
+    sa.column('career_page_id'),
+    sa.column('url'),
+    sa.column('title'),
+    sa.column('external_id'),
+)
+
+
+def _unique_string(row) -> str:
+    # Same key fields as app.utils.hash.generate_job_external_id
+    return f"{row.career_page_id}:{row.url}:{row.title}".lower().strip()
+
+
+def _rehash_external_ids(hash_fn) -> None:
+    """Recompute external_id for every job posting with the given hash function."""
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(job_postings.c.id, job_postings.c.career_page_id, job_postings.c.url, job_postings.c.title)
+    ).all()
+    if not rows:
+        return
+
+    bind.execute(
+        job_postings.update()
+        .where(job_postings.c.id == sa.bindparam('row_id'))
+        .values(external_id=sa.bindparam('new_external_id')),
+        [{'row_id': row.id, 'new_external_id': hash_fn(_unique_string(row))} for row in rows]
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rehash_external_ids(lambda value: xxhash.xxh3_128_hexdigest(value.encode('utf-8', 'ignore')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rehash_external_ids(lambda value: hashlib.sha256(value.encode()).hexdigest())
@@ -0,0 +1,63 @@
+"""compress raw page contents
+
+Revision ID: 7b2e4a9c1d53
+Revises: d94b6f2e8a37
+Create Date: 2026-10-15 16:02:51.483390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import orjson
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e4a9c1d53'
+down_revision: Union[str, Sequence[str], None] = 'd94b6f2e8a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ZSTD_LEVEL = 3
+
+
+def _convert_data(old_type, new_type, convert, server_default=None) -> None:
+    """Rewrite raw_page_contents.data row by row into a column of new_type."""
+    op.add_column('raw_page_contents', sa.Column('data_new', new_type, nullable=True))
+
+    bind = op.get_bind()
+    raw_pages = sa.table('raw_page_contents', sa.column('content_hash'),
+                         sa.column('data', old_type), sa.column('data_new', new_type))
+    rows = bind.execute(sa.select(raw_pages.c.content_hash, raw_pages.c.data)).all()
+    if rows:
+        bind.execute(
+            raw_pages.update()
+            .where(raw_pages.c.content_hash == sa.bindparam('row_hash'))
+            .values(data_new=sa.bindparam('new_data', type_=new_type)),
+            [{'row_hash': row.content_hash, 'new_data': convert(row.data)} for row in rows]
+        )
+
+    op.drop_column('raw_page_contents', 'data')
+    op.alter_column('raw_page_contents', 'data_new', new_column_name='data',
+               existing_type=new_type, nullable=False, server_default=server_default)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _convert_data(
+        postgresql.JSONB(astext_type=sa.Text()),
+        sa.LargeBinary(),
+        lambda data: zstandard.compress(orjson.dumps(data), ZSTD_LEVEL)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert_data(
+        sa.LargeBinary(),
+        postgresql.JSONB(astext_type=sa.Text()),
+        lambda data: orjson.loads(zstandard.decompress(bytes(data))),
+        server_default=sa.text("'{}'::jsonb")
+    )
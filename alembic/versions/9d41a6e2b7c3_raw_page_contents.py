@@ -0,0 +1,40 @@
+"""raw page contents
+
+Revision ID: 9d41a6e2b7c3
+Revises: 3b8e1c4d9f20
+Create Date: 2026-10-15 10:03:17.550914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41a6e2b7c3'
+down_revision: Union[str, Sequence[str], None] = '3b8e1c4d9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('raw_page_contents',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.add_column('job_postings', sa.Column('raw_page_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_job_postings_raw_page_hash'), 'job_postings', ['raw_page_hash'], unique=False)
+    op.create_foreign_key('job_postings_raw_page_hash_fkey', 'job_postings', 'raw_page_contents', ['raw_page_hash'], ['content_hash'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('job_postings_raw_page_hash_fkey', 'job_postings', type_='foreignkey')
+    op.drop_index(op.f('ix_job_postings_raw_page_hash'), table_name='job_postings')
+    op.drop_column('job_postings', 'raw_page_hash')
+    op.drop_table('raw_page_contents')
@@ -0,0 +1,30 @@
+"""queue next_attempt_at
+
+Revision ID: a3c7e1f9d208
+Revises: 0f6b2d9c4e81
+Create Date: 2026-10-15 15:10:44.672019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c7e1f9d208'
+down_revision: Union[str, Sequence[str], None] = '0f6b2d9c4e81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notification_queue', sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text("(now() at time zone 'utc')"), nullable=False))
+    op.create_index('ix_queue_next_attempt_at', 'notification_queue', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_queue_next_attempt_at', table_name='notification_queue')
+    op.drop_column('notification_queue', 'next_attempt_at')
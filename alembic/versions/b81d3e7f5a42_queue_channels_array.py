@@ -0,0 +1,39 @@
+"""queue channels array
+
+Revision ID: b81d3e7f5a42
+Revises: 4a7c2f6b8e05
+Create Date: 2026-10-15 13:41:18.205734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d3e7f5a42'
+down_revision: Union[str, Sequence[str], None] = '4a7c2f6b8e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('notification_queue', 'channels',
+               existing_type=sa.String(),
+               type_=postgresql.ARRAY(sa.String()),
+               existing_nullable=False,
+               postgresql_using="string_to_array(replace(channels, ' ', ''), ',')")
+    op.create_index('ix_queue_channels', 'notification_queue', ['channels'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_queue_channels', table_name='notification_queue', postgresql_using='gin')
+    op.alter_column('notification_queue', 'channels',
+               existing_type=postgresql.ARRAY(sa.String()),
+               type_=sa.String(),
+               existing_nullable=False,
+               postgresql_using="array_to_string(channels, ',')")
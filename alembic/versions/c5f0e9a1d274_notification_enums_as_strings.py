@@ -0,0 +1,57 @@
+"""notification enums as strings
+
+Revision ID: c5f0e9a1d274
+Revises: 9d41a6e2b7c3
+Create Date: 2026-10-15 10:41:52.117302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f0e9a1d274'
+down_revision: Union[str, Sequence[str], None] = '9d41a6e2b7c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows hold the enum member names ('SENT'); store the values ('sent')
+    op.alter_column('notifications', 'channel',
+               existing_type=sa.Enum('EMAIL', 'DISCORD', 'DASHBOARD', name='notificationchannel'),
+               type_=sa.String(length=16),
+               existing_nullable=False,
+               postgresql_using='lower(channel::text)')
+    op.alter_column('notifications', 'status',
+               existing_type=sa.Enum('PENDING', 'SENT', 'FAILED', name='notificationstatus'),
+               type_=sa.String(length=16),
+               existing_nullable=False,
+               postgresql_using='lower(status::text)')
+    op.execute('DROP TYPE notificationchannel')
+    op.execute('DROP TYPE notificationstatus')
+    op.create_check_constraint('ck_notif_channel', 'notifications', "channel IN ('email', 'discord', 'dashboard')")
+    op.create_check_constraint('ck_notif_status', 'notifications', "status IN ('pending', 'sent', 'failed')")
+    op.create_index('ix_notif_status_pending', 'notifications', ['status'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notif_status_pending', table_name='notifications', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_constraint('ck_notif_status', 'notifications', type_='check')
+    op.drop_constraint('ck_notif_channel', 'notifications', type_='check')
+    op.execute("CREATE TYPE notificationchannel AS ENUM ('EMAIL', 'DISCORD', 'DASHBOARD')")
+    op.execute("CREATE TYPE notificationstatus AS ENUM ('PENDING', 'SENT', 'FAILED')")
+    op.alter_column('notifications', 'status',
+               existing_type=sa.String(length=16),
+               type_=sa.Enum('PENDING', 'SENT', 'FAILED', name='notificationstatus'),
+               existing_nullable=False,
+               postgresql_using='upper(status)::notificationstatus')
+    op.alter_column('notifications', 'channel',
+               existing_type=sa.String(length=16),
+               type_=sa.Enum('EMAIL', 'DISCORD', 'DASHBOARD', name='notificationchannel'),
+               existing_nullable=False,
+               postgresql_using='upper(channel)::notificationchannel')
@@ -0,0 +1,28 @@
+"""llm_cache expires_at index
+
+Revision ID: c6d1a8e4f372
+Revises: 7b2e4a9c1d53
+Create Date: 2026-10-15 17:21:08.310947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d1a8e4f372'
+down_revision: Union[str, Sequence[str], None] = '7b2e4a9c1d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_llm_cache_expires_at'), 'llm_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_cache_expires_at'), table_name='llm_cache')
@@ -0,0 +1,39 @@
+"""job postings external_id covering index
+
+Revision ID: d94b6f2e8a37
+Revises: a3c7e1f9d208
+Create Date: 2026-10-15 15:38:26.904153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd94b6f2e8a37'
+down_revision: Union[str, Sequence[str], None] = 'a3c7e1f9d208'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction; build the new index before
+    # dropping the old one so external_id stays unique throughout
+    with op.get_context().autocommit_block():
+        op.create_index('jobposting_external_id_uq', 'job_postings', ['external_id'], unique=True,
+                        postgresql_include=['id', 'last_seen_at', 'is_active'],
+                        postgresql_concurrently=True)
+        op.drop_index('ix_job_postings_external_id', table_name='job_postings',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_job_postings_external_id', 'job_postings', ['external_id'], unique=True,
+                        postgresql_concurrently=True)
+        op.drop_index('jobposting_external_id_uq', table_name='job_postings',
+                      postgresql_concurrently=True)
@@ -0,0 +1,38 @@
+"""queue priority smallint
+
+Revision ID: e27b5d8c6a19
+Revises: c5f0e9a1d274
+Create Date: 2026-10-15 11:20:06.843120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e27b5d8c6a19'
+down_revision: Union[str, Sequence[str], None] = 'c5f0e9a1d274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('notification_queue', 'priority',
+               existing_type=sa.String(),
+               type_=sa.SmallInteger(),
+               existing_nullable=False,
+               postgresql_using='priority::smallint')
+    op.create_index('ix_queue_priority_created', 'notification_queue', [sa.text('priority DESC'), 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_queue_priority_created', table_name='notification_queue')
+    op.alter_column('notification_queue', 'priority',
+               existing_type=sa.SmallInteger(),
+               type_=sa.String(),
+               existing_nullable=False,
+               postgresql_using='priority::varchar')
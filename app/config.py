@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     # Ollama
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.1:8b"
+    llm_concurrency: int = 4
+    llm_cache_ttl_hours: int = 24
+    llm_db_cache_ttl_days: int = 30
+    llm_num_ctx: int = 8192
+    llm_num_predict: int = 4096
 
     # Email (SMTP)
     smtp_host: str = "smtp.gmail.com"
@@ -28,9 +33,11 @@ class Settings(BaseSettings):
     # Scheduler
     scrape_interval_hours: int = 6
     notification_interval_minutes: int = 5
+    notification_batch_size: int = 500
 
     # Rate Limiting
     scrape_rate_limit: int = 10
+    scrape_concurrency: int = 5
 
     class Config:
         env_file = ".env"
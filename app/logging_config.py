@@ -0,0 +1,38 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+from app.config import settings
+
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Background listener shared by the process; set once by setup_logging()
+_log_listener = {"listener": None}
+
+
+def setup_logging():
+    """
+    Configure root logging for the current process.
+
+    Log calls only enqueue the record (QueueHandler); a QueueListener thread
+    formats it and writes it to stderr, so the event loop never blocks on output.
+    Safe to call more than once, e.g. again in the scrape process-pool child.
+    """
+    if _log_listener["listener"] is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(settings.log_level)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    _log_listener["listener"] = listener
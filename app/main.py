@@ -1,16 +1,52 @@
+import logging
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
+from sqlalchemy import text
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.pool import ProcessPoolExecutor
 from apscheduler.triggers.cron import CronTrigger
 
 from app.config import settings
-from app.database import engine, Base, SessionLocal
-from app.workers.scrape_worker import ScrapeWorker
-from app.workers.notification_worker import NotificationWorker
+from app.database import engine, Base, SessionManager
+from app.logging_config import setup_logging
+from app.workers.scrape_worker import run_scrape_job_sync
+from app.workers.notification_worker import run_notification_job
 
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Static body of GET /, serialized once at import
+_ROOT_BODY = orjson.dumps({
+    "message": "Job Scraper Service is running",
+    "app_name": settings.app_name,
+    "environment": settings.app_env
+})
+
 # Global scheduler instance
-scheduler = AsyncIOScheduler()
+# Manual triggers live in an in-memory store so they run on the worker that received them.
+# Scraping (Firecrawl + LLM) runs in the "heavy" process pool so it can't stall API requests.
+scheduler = AsyncIOScheduler(
+    jobstores={"manual": MemoryJobStore()},
+    executors={"default": AsyncIOExecutor(), "heavy": ProcessPoolExecutor(2)}
+)
+
+# Postgres advisory lock key; only the worker holding it runs the scheduled jobs
+SCHEDULER_LOCK_ID = 7264012
+_scheduler_lock = {"conn": None}
+
+# Never overlap a slow run, collapse missed runs into one, and drop runs
+# that are more than 5 minutes late (e.g. after downtime)
+SCHEDULED_JOB_DEFAULTS = {"max_instances": 1, "coalesce": True, "misfire_grace_time": 300}
+
+# Seconds to reuse the last database probe result in /health
+DB_HEALTH_TTL = 5
+_db_health_cache = {"status": None, "ts": 0.0}
 
 
 @asynccontextmanager
@@ -19,60 +55,75 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for FastAPI startup and shutdown events.
     Handles database initialization and scheduler management.
     """
-    print("\n" + "="*60)
-    print("[STARTUP] Initializing Job Scraper Service")
-    print("="*60 + "\n")
+    logger.info("[STARTUP] Initializing Job Scraper Service")
 
     # Create database tables
-    print("[STARTUP] Creating database tables...")
+    logger.info("[STARTUP] Creating database tables...")
     Base.metadata.create_all(bind=engine)
-    print("[STARTUP] Database tables created")
-
-    # Initialize workers
-    scrape_worker = ScrapeWorker()
-    notification_worker = NotificationWorker()
-
-    # Configure scheduled jobs
-    print("[STARTUP] Configuring scheduled jobs...")
-
-    # Scrape all career pages every N hours
-    scheduler.add_job(
-        scrape_worker.run_scrape_pipeline,
-        trigger=CronTrigger(hour=f"*/{settings.scrape_interval_hours}"),
-        id="scrape_career_pages",
-        name="Scrape all active career pages",
-        replace_existing=True
-    )
-    print(f"[STARTUP] Scheduled scrape job: every {settings.scrape_interval_hours} hours")
-
-    # Process notification queue every N minutes
-    scheduler.add_job(
-        notification_worker.run_notification_pipeline,
-        trigger=CronTrigger(minute=f"*/{settings.notification_interval_minutes}"),
-        id="process_notifications",
-        name="Process notification queue",
-        replace_existing=True
-    )
-    print(f"[STARTUP] Scheduled notification job: every {settings.notification_interval_minutes} minutes")
+    logger.info("[STARTUP] Database tables created")
+
+    # Elect a single scheduler leader across uvicorn workers
+    lock_conn = engine.connect()
+    is_leader = lock_conn.execute(
+        text("SELECT pg_try_advisory_lock(:lock_id)"),
+        {"lock_id": SCHEDULER_LOCK_ID}
+    ).scalar()
+    lock_conn.commit()  # Session-level lock outlives the transaction
+
+    if is_leader:
+        _scheduler_lock["conn"] = lock_conn
+
+        # Persistent jobstore keeps schedules across restarts
+        scheduler.add_jobstore(SQLAlchemyJobStore(engine=engine), "default")
+
+        # Configure scheduled jobs
+        logger.info("[STARTUP] Configuring scheduled jobs...")
+
+        # Scrape all career pages every N hours
+        scheduler.add_job(
+            run_scrape_job_sync,
+            trigger=CronTrigger(hour=f"*/{settings.scrape_interval_hours}"),
+            id="scrape_career_pages",
+            name="Scrape all active career pages",
+            executor="heavy",
+            replace_existing=True,
+            **SCHEDULED_JOB_DEFAULTS
+        )
+        logger.info("[STARTUP] Scheduled scrape job: every %s hours", settings.scrape_interval_hours)
+
+        # Process notification queue every N minutes
+        scheduler.add_job(
+            run_notification_job,
+            trigger=CronTrigger(minute=f"*/{settings.notification_interval_minutes}"),
+            id="process_notifications",
+            name="Process notification queue",
+            replace_existing=True,
+            **SCHEDULED_JOB_DEFAULTS
+        )
+        logger.info("[STARTUP] Scheduled notification job: every %s minutes", settings.notification_interval_minutes)
+    else:
+        lock_conn.close()
+        logger.info("[STARTUP] Another worker owns the scheduled jobs; serving manual triggers only")
 
     # Start the scheduler
     scheduler.start()
-    print("[STARTUP] Scheduler started")
-
-    print("\n" + "="*60)
-    print("[STARTUP] Job Scraper Service is ready")
-    print("="*60 + "\n")
+    logger.info("[STARTUP] Scheduler started")
+    logger.info("[STARTUP] Job Scraper Service is ready")
 
     yield  # Application runs here
 
     # Shutdown
-    print("\n" + "="*60)
-    print("[SHUTDOWN] Shutting down Job Scraper Service")
-    print("="*60 + "\n")
+    logger.info("[SHUTDOWN] Shutting down Job Scraper Service")
 
     scheduler.shutdown()
-    print("[SHUTDOWN] Scheduler stopped")
-    print("[SHUTDOWN] Goodbye!")
+    logger.info("[SHUTDOWN] Scheduler stopped")
+
+    lock_conn = _scheduler_lock["conn"]
+    if lock_conn is not None:
+        lock_conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": SCHEDULER_LOCK_ID})
+        lock_conn.close()
+        _scheduler_lock["conn"] = None
+    logger.info("[SHUTDOWN] Goodbye!")
 
 
 # Create FastAPI application
@@ -89,10 +140,18 @@ async def root():
     """
     Basic health check endpoint.
     """
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+
+@app.get("/healthz")
+async def liveness_check():
+    """
+    Liveness endpoint for load balancers / k8s livenessProbe.
+    Reports process and scheduler state only - no database access.
+    """
     return {
-        "message": "Job Scraper Service is running",
-        "app_name": settings.app_name,
-        "environment": settings.app_env
+        "status": "ok",
+        "scheduler": scheduler.running
     }
 
 
@@ -100,15 +159,22 @@ async def root():
 async def health_check():
     """
     Detailed health check endpoint with database and scheduler status.
+    Intended for readiness probes; use /healthz for liveness.
     """
-    # Check database connection
-    db_status = "healthy"
-    try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
-    except Exception as e:
-        db_status = f"unhealthy: {str(e)}"
+    # Check database connection (cached briefly so frequent probes don't hit Postgres)
+    now = time.monotonic()
+    if now - _db_health_cache["ts"] < DB_HEALTH_TTL and _db_health_cache["status"]:
+        db_status = _db_health_cache["status"]
+    else:
+        db_status = "healthy"
+        try:
+            with SessionManager() as db:
+                db.execute(text("SELECT 1"))
+        except Exception as e:
+            db_status = f"unhealthy: {str(e)}"
+
+        _db_health_cache["status"] = db_status
+        _db_health_cache["ts"] = now
 
     # Check scheduler status
     scheduler_status = "running" if scheduler.running else "stopped"
@@ -117,6 +183,7 @@ async def health_check():
         "status": "healthy" if db_status == "healthy" else "degraded",
         "database": db_status,
         "scheduler": scheduler_status,
+        "scheduler_leader": _scheduler_lock["conn"] is not None,
         "scheduled_jobs": [
             {
                 "id": job.id,
@@ -134,16 +201,19 @@ async def trigger_scrape():
     Manually trigger a scrape of all active career pages.
     Useful for testing without waiting for the scheduled job.
     """
-    print("\n[MANUAL TRIGGER] Scrape pipeline triggered via API")
+    logger.info("[MANUAL TRIGGER] Scrape pipeline triggered via API")
 
-    scrape_worker = ScrapeWorker()
-
-    # Run in background (non-blocking)
+    # Run in background (non-blocking). One-off "date" job that runs now; the fixed
+    # id + max_instances=1 means repeated hits replace or skip instead of stacking
     scheduler.add_job(
-        scrape_worker.run_scrape_pipeline,
+        run_scrape_job_sync,
+        trigger="date",
         id="manual_scrape",
         name="Manual scrape trigger",
-        replace_existing=True
+        executor="heavy",
+        jobstore="manual",
+        replace_existing=True,
+        max_instances=1
     )
 
     return {
@@ -158,16 +228,17 @@ async def trigger_notifications():
     Manually trigger processing of the notification queue.
     Useful for testing without waiting for the scheduled job.
     """
-    print("\n[MANUAL TRIGGER] Notification processing triggered via API")
-
-    notification_worker = NotificationWorker()
+    logger.info("[MANUAL TRIGGER] Notification processing triggered via API")
 
-    # Run in background (non-blocking)
+    # Run in background (non-blocking), same guards as the scrape trigger
     scheduler.add_job(
-        notification_worker.run_notification_pipeline,
+        run_notification_job,
+        trigger="date",
         id="manual_notifications",
         name="Manual notification trigger",
-        replace_existing=True
+        jobstore="manual",
+        replace_existing=True,
+        max_instances=1
     )
 
     return {
@@ -1,5 +1,7 @@
 from app.models.career_page import CareerPage
 from app.models.job_posting import JobPosting
+from app.models.raw_page_content import RawPageContent
+from app.models.llm_cache import LLMCache
 from app.models.user import User
 from app.models.base import Base
 from app.models.notification import Notification, NotificationQueue, NotificationChannel, NotificationStatus
@@ -8,6 +10,8 @@ __all__ = [
     "Base",
     "CareerPage",
     "JobPosting",
+    "RawPageContent",
+    "LLMCache",
     "User",
     "Notification",
     "NotificationQueue",
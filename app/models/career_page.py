@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Boolean, DateTime, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, DateTime, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -13,7 +13,7 @@ class CareerPage(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_name = Column(String, nullable=False)
     url = Column(String, unique=True, nullable=False, index=True)
-    scrape_config = Column(JSON, default={})
+    scrape_config = Column(JSONB, default={}, server_default=text("'{}'::jsonb"))
     is_active = Column(Boolean, default=True, nullable=False)
     last_scraped_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -9,10 +9,15 @@ from app.models.base import Base
 
 class JobPosting(Base):
     __tablename__ = "job_postings"
+    __table_args__ = (
+        # Unique covering index: dedup lookups and ON CONFLICT (external_id) are index-only scans
+        Index("jobposting_external_id_uq", "external_id", unique=True,
+              postgresql_include=["id", "last_seen_at", "is_active"]),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     career_page_id = Column(UUID(as_uuid=True), ForeignKey("career_pages.id"), nullable=False)
-    external_id = Column(String, unique=True, nullable=False, index=True)
+    external_id = Column(String, nullable=False)
 
     # Normalized fields (extracted by LLM from raw_data)
     title = Column(String, nullable=False)
@@ -23,8 +28,10 @@ class JobPosting(Base):
     requirements = Column(Text, nullable=True)
     url = Column(String, nullable=False)
 
-    # Complete raw data from Firecrawl (preserves everything)
-    raw_data = Column(JSON, default={}, nullable=False)
+    # Reference to the scraped page this job was extracted from: {"hash": ..., "url": ...}
+    # The full Firecrawl payload lives once per page in raw_page_contents
+    raw_data = Column(JSONB, default={}, server_default=text("'{}'::jsonb"), nullable=False)
+    raw_page_hash = Column(String(64), ForeignKey("raw_page_contents.content_hash"), nullable=True, index=True)
 
     # Metadata
     normalized_at = Column(DateTime, nullable=True)
@@ -35,7 +42,9 @@ class JobPosting(Base):
 
     # Relationships
     career_page = relationship("CareerPage", back_populates="job_postings")
+    raw_page = relationship("RawPageContent", back_populates="job_postings")
     notifications = relationship("Notification", back_populates="job_posting")
 
     def __repr__(self):
-        return f"<JobPosting(title='{self.title}', company='{self.career_page.company_name if self.career_page else 'N/A'}')>"
+        # No relationship access here: a lazy load per repr() is an easy N+1
+        return f"<JobPosting(title='{self.title}', career_page_id='{self.career_page_id}')>"
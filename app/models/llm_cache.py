@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Text, DateTime
+from datetime import datetime
+
+from app.models.base import Base
+
+
+class LLMCache(Base):
+    __tablename__ = "llm_cache"
+
+    # "llm_norm:{prompt_version}:{model}:{content_hash}"; a prompt or model change misses naturally
+    cache_key = Column(String(160), primary_key=True)
+
+    # Raw model output; parsed again on each hit so per-page metadata stays current
+    output = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Indexed for the purge of expired rows at the start of each scrape run
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<LLMCache(cache_key='{self.cache_key}', expires_at='{self.expires_at}')>"
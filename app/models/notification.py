@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, Index, SmallInteger, text
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -20,15 +20,33 @@ class NotificationStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+def _enum_values(enum_cls):
+    return [member.value for member in enum_cls]
+
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Partial index: pending scans stay O(pending) rather than O(table)
+        Index("ix_notif_status_pending", "status", postgresql_where=text("status = 'pending'")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     job_posting_id = Column(UUID(as_uuid=True), ForeignKey("job_postings.id"), nullable=False)
 
-    channel = Column(Enum(NotificationChannel), nullable=False)
-    status = Column(Enum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False)
+    # Stored as short strings + CHECK constraints (no Postgres ENUM types to ALTER)
+    channel = Column(
+        Enum(NotificationChannel, native_enum=False, length=16, create_constraint=True,
+             name="ck_notif_channel", values_callable=_enum_values),
+        nullable=False
+    )
+    status = Column(
+        Enum(NotificationStatus, native_enum=False, length=16, create_constraint=True,
+             name="ck_notif_status", values_callable=_enum_values),
+        default=NotificationStatus.PENDING,
+        nullable=False
+    )
 
     sent_at = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
@@ -44,15 +62,32 @@ class Notification(Base):
 
 class NotificationQueue(Base):
     __tablename__ = "notification_queue"
+    __table_args__ = (
+        # Lets each channel worker pull only its rows: WHERE channels @> ARRAY['email']
+        Index("ix_queue_channels", "channels", postgresql_using="gin"),
+        # Due-entry filter of the worker's poll: WHERE next_attempt_at <= now (UTC)
+        Index("ix_queue_next_attempt_at", "next_attempt_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     job_posting_id = Column(UUID(as_uuid=True), ForeignKey("job_postings.id"), nullable=False)
 
-    # Which channels to notify (can be multiple)
-    channels = Column(String, nullable=False)  # Comma-separated: "email,discord,dashboard"
-    priority = Column(String, default=0, nullable=False)
+    # Channels still to notify; each is removed once sent and the row is deleted when empty
+    channels = Column(ARRAY(String), nullable=False)
+    priority = Column(SmallInteger, default=0, nullable=False)  # Higher is sent first
+    # Not picked up before this time (UTC); pushed back when a send errors (a failed channel
+    # of a multi-channel entry is split into its own row, so only that channel waits)
+    next_attempt_at = Column(DateTime, server_default=text("(now() at time zone 'utc')"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # Relationships
+    user = relationship("User")
+    job_posting = relationship("JobPosting")
+
     def __repr__(self):
         return f"<NotificationQueue(user_id='{self.user_id}', channels='{self.channels}')>"
+
+
+# Matches the worker's dequeue order: ORDER BY priority DESC, created_at
+Index("ix_queue_priority_created", NotificationQueue.priority.desc(), NotificationQueue.created_at)
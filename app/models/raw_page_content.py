@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, DateTime, LargeBinary
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.models.base import Base
+
+
+class RawPageContent(Base):
+    __tablename__ = "raw_page_contents"
+
+    # SHA256 of the scraped markdown; identical pages are stored once
+    content_hash = Column(String(64), primary_key=True)
+    url = Column(String, nullable=False)
+
+    # Complete raw data from Firecrawl (preserves everything), as zstd-compressed JSON;
+    # read it with app.utils.decompress_json
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    job_postings = relationship("JobPosting", back_populates="raw_page")
+
+    def __repr__(self):
+        return f"<RawPageContent(content_hash='{self.content_hash}', url='{self.url}')>"
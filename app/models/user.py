@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Boolean, DateTime, JSON, ARRAY
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, DateTime, ARRAY, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -9,6 +9,11 @@ from app.models.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_is_active", "is_active"),
+        # GIN index serves the JSONB containment / key lookups used by matching
+        Index("ix_users_preferences", "preferences", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -21,7 +26,7 @@ class User(Base):
     #   "experience_levels": ["Senior", "Lead"],
     #   "company_ids": ["uuid1", "uuid2"]  # Specific companies to follow
     # }
-    preferences = Column(JSON, default={}, nullable=False)
+    preferences = Column(JSONB, default={}, server_default=text("'{}'::jsonb"), nullable=False)
 
     # Notification channels: email, discord, dashboard
     notification_channels = Column(ARRAY(String), default=["email"], nullable=False)
@@ -1,125 +1,434 @@
-from typing import Dict, List, Optional
+import logging
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import asyncio
 import json
+import re
+import time
+from datetime import datetime, timedelta
+import httpx
 import ollama
+import orjson
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
 from app.config import settings
+from app.database import SessionManager
+from app.models import LLMCache
+from app.utils import generate_simple_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bump whenever _PROMPT_TEMPLATE or the parsing contract changes; it is part of the
+# cache key, so outputs from an older prompt are never reused
+PROMPT_VERSION = 3
+
+# Raw LLM output is cached in two tiers keyed by prompt version, model and page content hash.
+# Career pages are re-scraped every few hours, usually unchanged, so identical content skips
+# the model entirely. L1 is this process-wide LRU of (stored_at, llm_output); L2 is the
+# llm_cache table, which survives restarts and is shared by every worker process.
+_NORMALIZATION_CACHE_SIZE = 256
+_normalization_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+# Shared decoder for the raw_decode fallback in _parse_llm_response. The object is located
+# with str.find + raw_decode, a single linear pass; a greedy regex such as r"\{.*\}"
+# would backtrack over long replies and could swallow trailing bracketed prose
+_json_decoder = json.JSONDecoder()
+
+# Firecrawl markdown is padded with indentation and runs of blank lines; collapsing
+# them lets more real content fit in the prompt's character budget
+_HORIZONTAL_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n(?: ?\n)+")
+
+# Retry policy for Ollama calls: the server answers 429/503 when its request queue
+# is full (OLLAMA_MAX_QUEUE), which the concurrent batch can trigger
+LLM_MAX_ATTEMPTS = 4
+LLM_MAX_BACKOFF = 30
+RETRYABLE_STATUS_CODES = {429, 503}
+
+# Generations can take minutes on a busy or CPU-only server; connecting should not
+LLM_TIMEOUT = httpx.Timeout(300, connect=10)
+
+
+class _JsonEndScanner:
+    """
+    Tracks bracket depth across streamed model output, ignoring brackets inside
+    JSON strings, to spot the moment the top-level {"jobs": [...]} object closes.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        """
+        Scan the next chunk of output.
+
+        Returns:
+            True once the object is complete
+        """
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif not self.started:
+                # Skip any preamble before the object
+                if ch == "{":
+                    self.started = True
+                    self.depth = 1
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "[{":
+                self.depth += 1
+            elif ch in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+
+        return False
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry on an overloaded Ollama server or a dropped connection."""
+    if isinstance(exc, ollama.ResponseError):
+        return exc.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+# Static normalization prompt, built once at import; only company and content vary per page
+_PROMPT_TEMPLATE = """Extract ALL job postings from the following career page content for {company}.
+
+For EACH job posting found, extract the following information:
+- title: Job title (required)
+- location: Job location or "Remote" if applicable
+- job_type: Type of employment (e.g., "Full-time", "Part-time", "Contract", "Remote", "Hybrid")
+- experience_level: Required experience level (e.g., "Entry", "Mid-level", "Senior", "Lead", "Executive")
+- description: Brief job description (1-3 sentences)
+- requirements: Key requirements or skills needed
+- url: Direct URL to the job posting (if available in the content)
+
+Return the results as a JSON object with a single "jobs" key holding an array.
+Each job should be a separate object in the array.
+
+Example output format:
+{{
+  "jobs": [
+    {{
+      "title": "Senior Software Engineer",
+      "location": "San Francisco, CA",
+      "job_type": "Full-time",
+      "experience_level": "Senior",
+      "description": "Build scalable backend systems for our platform.",
+      "requirements": "5+ years Python, AWS, microservices architecture",
+      "url": "https://careers.company.com/jobs/12345"
+    }},
+    {{
+      "title": "Product Designer",
+      "location": "Remote",
+      "job_type": "Remote",
+      "experience_level": "Mid-level",
+      "description": "Design user experiences for our mobile app.",
+      "requirements": "3+ years UI/UX design, Figma, user research",
+      "url": "https://careers.company.com/jobs/12346"
+    }}
+  ]
+}}
+
+IMPORTANT:
+- Extract ALL jobs you can find in the content
+- If a field is not available, use null
+- Return ONLY valid JSON, no additional text or explanations
+- If no jobs are found, return {{"jobs": []}}
+
+Career Page Content:
+{content}
+"""
 
 
 class LLMService:
     def __init__(self):
-        self.client = ollama.Client(host=settings.ollama_base_url)
+        # One pooled, kept-alive HTTP client per service instance; extra kwargs go to httpx
+        self.client = ollama.AsyncClient(
+            host=settings.ollama_base_url,
+            timeout=LLM_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.llm_concurrency,
+                max_keepalive_connections=settings.llm_concurrency,
+                keepalive_expiry=30.0
+            )
+        )
         self.model = settings.ollama_model
+        # Caps concurrent Ollama requests issued by normalize_job_data_batch
+        self.semaphore = asyncio.Semaphore(settings.llm_concurrency)
+
+    async def normalize_job_data_batch(self, raw_jobs: List[Dict]) -> List[List[Dict]]:
+        """
+        Normalize several raw job entries concurrently.
+
+        Requests are bounded by the llm_concurrency setting so the Ollama
+        server is not flooded.
+
+        Args:
+            raw_jobs: List of raw job data dictionaries from Firecrawl
+
+        Returns:
+            List of normalized job lists, in the same order as raw_jobs
+        """
+        async def _normalize(raw_job: Dict) -> List[Dict]:
+            async with self.semaphore:
+                return await self.normalize_job_data(raw_job)
+
+        return await asyncio.gather(*(_normalize(raw_job) for raw_job in raw_jobs))
 
     async def normalize_job_data(self, raw_job: Dict) -> List[Dict]:
         """
         Use LLM to extract and normalize job postings from raw scraped data.
 
+        Only raw_content (markdown) goes into the prompt; html_content is never read,
+        so callers can drop it beforehand. raw_job itself is not modified.
+
         Args:
-            raw_job: Raw job data from Firecrawl containing markdown/html content
+            raw_job: Raw job data from Firecrawl containing markdown content
 
         Returns:
             List of normalized job dictionaries with structured fields
         """
-        print(f"[LLM] Normalizing job data from {raw_job.get('company_name', 'Unknown')}")
+        logger.info("[LLM] Normalizing job data from %s", raw_job.get('company_name', 'Unknown'))
 
         raw_content = raw_job.get("raw_content", "")
         company_name = raw_job.get("company_name", "")
 
         if not raw_content:
-            print(f"[LLM] No content to normalize")
+            logger.info("[LLM] No content to normalize")
             return []
 
+        content_hash = raw_job.get("content_hash") or generate_simple_hash(raw_content)
+        cache_key = f"llm_norm:{PROMPT_VERSION}:{self.model}:{content_hash}"
+
+        cached_output = await self._get_cached_output(cache_key)
+        if cached_output is not None:
+            normalized_jobs = self._parse_llm_response(cached_output, raw_job) or []
+            logger.info("[LLM] Cache hit, reused %s job postings", len(normalized_jobs))
+            return normalized_jobs
+
         # Build the prompt
         prompt = self._build_normalization_prompt(raw_content, company_name)
 
         try:
-            # Call Ollama
-            response = self.client.chat(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a job posting data extraction assistant. Extract structured job information from raw career page content."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                options={
-                    "temperature": 0.1,  # Low temperature for consistent extraction
-                }
-            )
+            llm_output = await self._chat(prompt)
 
-            # Parse the response
-            llm_output = response["message"]["content"]
+            # Parse the response; only well-formed output is cached, so an empty,
+            # truncated or garbled reply is retried next scrape instead of pinned for days
             normalized_jobs = self._parse_llm_response(llm_output, raw_job)
+            if normalized_jobs is None:
+                return []
 
-            print(f"[LLM] Extracted {len(normalized_jobs)} job postings")
+            await self._cache_output(cache_key, llm_output)
+
+            logger.info("[LLM] Extracted %s job postings", len(normalized_jobs))
             return normalized_jobs
 
         except Exception as e:
-            print(f"[LLM] Error normalizing job data: {str(e)}")
+            logger.error("[LLM] Error normalizing job data: %s", e)
             return []
 
-    def _build_normalization_prompt(self, raw_content: str, company_name: str) -> str:
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=1, max=LLM_MAX_BACKOFF),
+        reraise=True
+    )
+    async def _chat(self, prompt: str) -> str:
         """
-        Build a prompt for the LLM to extract job information.
+        Send the normalization prompt to Ollama, retrying with jittered backoff
+        while the server is overloaded (429/503) or the connection drops.
+
+        Ollama's JSON mode constrains sampling to valid JSON, and the reply is
+        streamed so reading stops as soon as that JSON value closes.
 
         Args:
-            raw_content: Raw markdown/html content from Firecrawl
-            company_name: Company name
+            prompt: Normalization prompt for one career page
 
         Returns:
-            Formatted prompt string
+            Raw model output, up to the end of the JSON value
+        """
+        # Call Ollama (async client, does not block the event loop)
+        stream = await self.client.chat(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a job posting data extraction assistant. Extract structured job information from raw career page content."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            format="json",
+            options={
+                "temperature": 0.1,  # Low temperature for consistent extraction
+                "top_p": 0.9,
+                # Prompt (template + up to 8000 chars of content) plus the reply must fit;
+                # the model default can be far larger and allocates a KV cache to match
+                "num_ctx": settings.llm_num_ctx,
+                "num_predict": settings.llm_num_predict
+            },
+            stream=True
+        )
+
+        parts = []
+        scanner = _JsonEndScanner()
+        try:
+            async for chunk in stream:
+                text = chunk["message"]["content"]
+                parts.append(text)
+                if scanner.feed(text):
+                    break
+        finally:
+            # Closing the response early makes Ollama stop generating
+            await stream.aclose()
+
+        return "".join(parts)
+
+    async def _get_cached_output(self, cache_key: str) -> Optional[str]:
         """
-        prompt = f"""Extract ALL job postings from the following career page content for {company_name}.
+        Look up a previous LLM output for the same prompt, model and page content.
+        Checks the in-process LRU first, then the llm_cache table (in a worker thread,
+        since the session is blocking).
 
-For EACH job posting found, extract the following information:
-- title: Job title (required)
-- location: Job location or "Remote" if applicable
-- job_type: Type of employment (e.g., "Full-time", "Part-time", "Contract", "Remote", "Hybrid")
-- experience_level: Required experience level (e.g., "Entry", "Mid-level", "Senior", "Lead", "Executive")
-- description: Brief job description (1-3 sentences)
-- requirements: Key requirements or skills needed
-- url: Direct URL to the job posting (if available in the content)
+        Args:
+            cache_key: Key built from prompt version, model and content hash
 
-Return the results as a JSON array. Each job should be a separate object in the array.
+        Returns:
+            Cached LLM output, or None if missing or expired
+        """
+        entry = _normalization_cache.get(cache_key)
+        if entry is not None:
+            stored_at, llm_output = entry
+            if time.monotonic() - stored_at <= settings.llm_cache_ttl_hours * 3600:
+                _normalization_cache.move_to_end(cache_key)
+                return llm_output
+            del _normalization_cache[cache_key]
 
-Example output format:
-[
-  {{
-    "title": "Senior Software Engineer",
-    "location": "San Francisco, CA",
-    "job_type": "Full-time",
-    "experience_level": "Senior",
-    "description": "Build scalable backend systems for our platform.",
-    "requirements": "5+ years Python, AWS, microservices architecture",
-    "url": "https://careers.company.com/jobs/12345"
-  }},
-  {{
-    "title": "Product Designer",
-    "location": "Remote",
-    "job_type": "Remote",
-    "experience_level": "Mid-level",
-    "description": "Design user experiences for our mobile app.",
-    "requirements": "3+ years UI/UX design, Figma, user research",
-    "url": "https://careers.company.com/jobs/12346"
-  }}
-]
+        try:
+            llm_output = await asyncio.to_thread(self._load_cached_output, cache_key)
+        except Exception as e:
+            # The cache is an optimization; a database problem just means a miss
+            logger.warning("[LLM] Cache lookup failed: %s", e)
+            return None
 
-IMPORTANT:
-- Extract ALL jobs you can find in the content
-- If a field is not available, use null
-- Return ONLY valid JSON, no additional text or explanations
-- If no jobs are found, return an empty array: []
+        if llm_output is not None:
+            self._cache_output_in_memory(cache_key, llm_output)
+        return llm_output
 
-Career Page Content:
-{raw_content[:8000]}
-"""  # Limit content to ~8000 chars to avoid token limits
+    def _load_cached_output(self, cache_key: str) -> Optional[str]:
+        """
+        Read an unexpired LLM output from the llm_cache table.
+
+        Args:
+            cache_key: Key built from prompt version, model and content hash
+
+        Returns:
+            Cached LLM output, or None if missing or expired
+        """
+        with SessionManager() as db:
+            row = db.get(LLMCache, cache_key)
+            if row is None or row.expires_at <= datetime.utcnow():
+                return None
+            return row.output
+
+    async def _cache_output(self, cache_key: str, llm_output: str):
+        """
+        Store an LLM output in both cache tiers.
+
+        Args:
+            cache_key: Key built from prompt version, model and content hash
+            llm_output: Raw text returned by the model
+        """
+        self._cache_output_in_memory(cache_key, llm_output)
 
-        return prompt
+        try:
+            await asyncio.to_thread(self._store_cached_output, cache_key, llm_output)
+        except Exception as e:
+            logger.warning("[LLM] Cache write failed: %s", e)
 
-    def _parse_llm_response(self, llm_output: str, raw_job: Dict) -> List[Dict]:
+    def _store_cached_output(self, cache_key: str, llm_output: str):
+        """
+        Upsert an LLM output into the llm_cache table.
+
+        Args:
+            cache_key: Key built from prompt version, model and content hash
+            llm_output: Raw text returned by the model
+        """
+        now = datetime.utcnow()
+        expires_at = now + timedelta(days=settings.llm_db_cache_ttl_days)
+        stmt = insert(LLMCache).values(
+            cache_key=cache_key,
+            output=llm_output,
+            created_at=now,
+            expires_at=expires_at
+        ).on_conflict_do_update(
+            index_elements=["cache_key"],
+            set_={"output": llm_output, "created_at": now, "expires_at": expires_at}
+        )
+
+        with SessionManager() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def purge_expired_cache(self) -> int:
+        """
+        Delete expired rows from the llm_cache table.
+        Pages whose content changed are never looked up again, so without this
+        their old outputs would pile up.
+
+        Returns:
+            Number of rows deleted
+        """
+        with SessionManager() as db:
+            result = db.execute(delete(LLMCache).where(LLMCache.expires_at <= datetime.utcnow()))
+            db.commit()
+            return result.rowcount
+
+    def _cache_output_in_memory(self, cache_key: str, llm_output: str):
+        """
+        Store an LLM output in the in-process LRU, evicting the least recently used entry when full.
+
+        Args:
+            cache_key: Key built from prompt version, model and content hash
+            llm_output: Raw text returned by the model
+        """
+        _normalization_cache[cache_key] = (time.monotonic(), llm_output)
+        _normalization_cache.move_to_end(cache_key)
+        if len(_normalization_cache) > _NORMALIZATION_CACHE_SIZE:
+            _normalization_cache.popitem(last=False)
+
+    def _build_normalization_prompt(self, raw_content: str, company_name: str) -> str:
+        """
+        Build a prompt for the LLM to extract job information.
+
+        Args:
+            raw_content: Raw markdown/html content from Firecrawl
+            company_name: Company name
+
+        Returns:
+            Formatted prompt string
+        """
+        content = _HORIZONTAL_SPACE_RE.sub(" ", raw_content)
+        content = _BLANK_LINES_RE.sub("\n\n", content).strip()
+
+        # Limit content to ~8000 chars to avoid token limits
+        return _PROMPT_TEMPLATE.format(company=company_name, content=content[:8000])
+
+    def _parse_llm_response(self, llm_output: str, raw_job: Dict) -> Optional[List[Dict]]:
         """
         Parse LLM response and create normalized job dictionaries.
 
@@ -128,44 +437,51 @@ Career Page Content:
             raw_job: Original raw job data
 
         Returns:
-            List of normalized job dictionaries
+            List of normalized job dictionaries (possibly empty), or None if the
+            output is malformed (not JSON, truncated, or missing the "jobs" array)
         """
         try:
-            # Extract JSON from response (LLM might include extra text)
-            llm_output = llm_output.strip()
+            try:
+                # Fast path: the whole response is the JSON object
+                response_data = orjson.loads(llm_output)
+            except orjson.JSONDecodeError:
+                # Extract JSON from response (LLM might include extra text)
+                # Decode from the first "{" and stop at its matching brace -
+                # no scan for the last "}" and no sliced copy of the output
+                start_idx = llm_output.find("{")
 
-            # Find JSON array in response
-            start_idx = llm_output.find("[")
-            end_idx = llm_output.rfind("]") + 1
+                if start_idx == -1:
+                    logger.warning("[LLM] No JSON object found in response")
+                    return None
 
-            if start_idx == -1 or end_idx == 0:
-                print(f"[LLM] No JSON array found in response")
-                return []
+                response_data, _ = _json_decoder.raw_decode(llm_output, start_idx)
 
-            json_str = llm_output[start_idx:end_idx]
-            jobs_data = json.loads(json_str)
+            # The prompt asks for {"jobs": [...]}; anything else is malformed
+            jobs_data = response_data.get("jobs") if isinstance(response_data, dict) else None
 
             if not isinstance(jobs_data, list):
-                print(f"[LLM] Response is not a list")
-                return []
+                logger.warning('[LLM] Response has no "jobs" array')
+                return None
 
             # Enhance each job with metadata from raw_job
             normalized_jobs = []
             for job in jobs_data:
-                if not job.get("title"):
+                if not isinstance(job, dict) or not job.get("title"):
                     continue  # Skip jobs without titles
 
                 normalized_job = {
-                    "title": job.get("title", "").strip(),
-                    "location": job.get("location", "").strip() or None,
-                    "job_type": job.get("job_type", "").strip() or None,
-                    "experience_level": job.get("experience_level", "").strip() or None,
-                    "description": job.get("description", "").strip() or None,
-                    "requirements": job.get("requirements", "").strip() or None,
-                    "url": job.get("url", "").strip() or raw_job.get("url", ""),
+                    "title": (job.get("title") or "").strip(),
+                    "location": (job.get("location") or "").strip() or None,
+                    "job_type": (job.get("job_type") or "").strip() or None,
+                    "experience_level": (job.get("experience_level") or "").strip() or None,
+                    "description": (job.get("description") or "").strip() or None,
+                    "requirements": (job.get("requirements") or "").strip() or None,
+                    "url": (job.get("url") or "").strip() or raw_job.get("url", ""),
                     "career_page_id": raw_job.get("career_page_id"),
                     "company_name": raw_job.get("company_name"),
-                    "raw_data": raw_job  # Store complete raw data
+                    # Reference the stored page instead of copying it into every job
+                    "raw_page_hash": raw_job.get("content_hash"),
+                    "raw_data": {"hash": raw_job.get("content_hash"), "url": raw_job.get("url")}
                 }
 
                 normalized_jobs.append(normalized_job)
@@ -173,9 +489,9 @@ Career Page Content:
             return normalized_jobs
 
         except json.JSONDecodeError as e:
-            print(f"[LLM] Failed to parse JSON: {str(e)}")
-            print(f"[LLM] Response was: {llm_output[:500]}")
-            return []
+            logger.error("[LLM] Failed to parse JSON: %s", e)
+            logger.warning("[LLM] Response was: %s", llm_output[:500])
+            return None
         except Exception as e:
-            print(f"[LLM] Error parsing LLM response: {str(e)}")
-            return []
+            logger.error("[LLM] Error parsing LLM response: %s", e)
+            return None
@@ -1,9 +1,83 @@
-from typing import List
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import and_, or_, literal_column, insert
 from sqlalchemy.orm import Session
-from app.models import JobPosting, User, NotificationQueue
+from app.models import JobPosting, User, NotificationQueue, NotificationChannel
 from datetime import datetime
 
 
+logger = logging.getLogger(__name__)
+
+
+# Preference fields matched by exact value, paired with how to read the value off a job
+_EXACT_MATCH_FIELDS = {
+    "job_types": lambda job: job.job_type,
+    "experience_levels": lambda job: job.experience_level,
+    "company_ids": lambda job: str(job.career_page_id),
+}
+
+# Channel names the notification worker drains from the queue
+_QUEUE_CHANNELS = {channel.value for channel in NotificationChannel}
+
+
+class UserPreferenceIndex:
+    """
+    Column-oriented index over users' exact-match preferences.
+
+    For each field it keeps a boolean array "user specified this field" and one
+    boolean array per distinct preferred value, so matching a job against every
+    user is a handful of vectorized NumPy ANDs/ORs instead of a Python loop.
+    Location is substring-based and is still checked per candidate.
+    """
+
+    def __init__(self, users: List[User]):
+        self.users = users
+        self._has_preference: Dict[str, np.ndarray] = {}
+        self._value_masks: Dict[str, Dict[str, np.ndarray]] = {}
+
+        for field in _EXACT_MATCH_FIELDS:
+            has_preference = np.zeros(len(users), dtype=bool)
+            value_masks: Dict[str, np.ndarray] = {}
+
+            for idx, user in enumerate(users):
+                values = (user.preferences or {}).get(field) or []
+                if not values:
+                    continue
+
+                has_preference[idx] = True
+                for value in values:
+                    mask = value_masks.get(value)
+                    if mask is None:
+                        mask = value_masks[value] = np.zeros(len(users), dtype=bool)
+                    mask[idx] = True
+
+            self._has_preference[field] = has_preference
+            self._value_masks[field] = value_masks
+
+    def candidates(self, job: JobPosting) -> List[User]:
+        """
+        Users whose exact-match preferences are unset or contain the job's values.
+
+        Args:
+            job: JobPosting instance
+
+        Returns:
+            List of candidate User instances
+        """
+        selected = np.ones(len(self.users), dtype=bool)
+
+        for field, get_value in _EXACT_MATCH_FIELDS.items():
+            allowed = ~self._has_preference[field]
+            value = get_value(job)
+            mask = self._value_masks[field].get(value) if value else None
+            if mask is not None:
+                allowed |= mask
+            selected &= allowed
+
+        return [self.users[idx] for idx in np.flatnonzero(selected)]
+
+
 class MatchingService:
     async def find_matching_users(self, job: JobPosting, db: Session) -> List[User]:
         """
@@ -16,20 +90,100 @@ class MatchingService:
         Returns:
             List of User instances that match the job
         """
-        print(f"[MATCHING] Finding users for job: {job.title}")
+        logger.debug("[MATCHING] Finding users for job: %s", job.title)
 
-        # Get all active users
-        all_users = db.query(User).filter(User.is_active == True).all()
+        # Narrow down to active users whose exact-match preferences fit the job
+        # (server-side, GIN-indexed); location is still checked in Python
+        candidate_users = db.query(User).filter(
+            User.is_active == True,
+            *self._preference_filters(job)
+        ).all()
+
+        # Lowercase the job location once, not once per (user, preferred location),
+        # and each candidate's preferred locations once for this call
+        job_location = self._normalize_job_location(job)
+        locations_by_user = self._preferred_locations_by_user(candidate_users)
 
         matching_users = []
-        for user in all_users:
-            if await self.check_user_match(user, job):
+        for user in candidate_users:
+            if await self.check_user_match(user, job, job_location, locations_by_user[user.id]):
                 matching_users.append(user)
 
-        print(f"[MATCHING] Found {len(matching_users)} matching users")
+        logger.info("[MATCHING] Found %s matching users", len(matching_users))
         return matching_users
 
-    async def check_user_match(self, user: User, job: JobPosting) -> bool:
+    async def find_matching_users_bulk(self, jobs: List[JobPosting], db: Session) -> Dict:
+        """
+        Find matching users for several jobs at once.
+        Active users that fit at least one job's exact-match preferences are
+        loaded in one query and indexed with UserPreferenceIndex; a single job
+        falls back to the SQL-filtered find_matching_users.
+
+        Args:
+            jobs: JobPosting instances
+            db: Database session
+
+        Returns:
+            Dict mapping job id to list of matching User instances
+        """
+        if len(jobs) == 1:
+            return {jobs[0].id: await self.find_matching_users(jobs[0], db)}
+
+        logger.info("[MATCHING] Finding users for %s jobs", len(jobs))
+
+        # Same GIN-indexed filters as the single-job path, OR-ed across the jobs,
+        # so only users that could match something are loaded and indexed
+        candidate_users = db.query(User).filter(
+            User.is_active == True,
+            or_(*(and_(*self._preference_filters(job)) for job in jobs))
+        ).all()
+        index = UserPreferenceIndex(candidate_users)
+        locations_by_user = self._preferred_locations_by_user(candidate_users)
+
+        matches = {}
+        for job in jobs:
+            job_location = self._normalize_job_location(job)
+            matches[job.id] = [
+                user for user in index.candidates(job)
+                if await self.check_user_match(user, job, job_location, locations_by_user[user.id])
+            ]
+
+        return matches
+
+    def _preference_filters(self, job: JobPosting) -> list:
+        """
+        Build SQL filters for the exact-match preference fields.
+        A user passes a field if they did not specify it, or if it contains the job's value.
+
+        Args:
+            job: JobPosting instance
+
+        Returns:
+            List of SQLAlchemy filter expressions
+        """
+        filters = []
+        for key, get_value in _EXACT_MATCH_FIELDS.items():
+            value = get_value(job)
+            # Missing key, null or empty list means "no preference"
+            not_specified = or_(
+                User.preferences[key].is_(None),
+                User.preferences[key] == literal_column("'[]'::jsonb"),
+                User.preferences[key] == literal_column("'null'::jsonb"),
+            )
+            if value:
+                filters.append(or_(not_specified, User.preferences.contains({key: [value]})))
+            else:
+                filters.append(not_specified)
+
+        return filters
+
+    async def check_user_match(
+        self,
+        user: User,
+        job: JobPosting,
+        job_location: Optional[Tuple[str, bool]] = None,
+        preferred_locations: Optional[List[Tuple[str, bool]]] = None
+    ) -> bool:
         """
         Check if a job matches a user's preferences.
         Only checks fields that user has specified in preferences.
@@ -37,6 +191,8 @@ class MatchingService:
         Args:
             user: User instance with preferences
             job: JobPosting instance
+            job_location: Precomputed result of _normalize_job_location(job), if available
+            preferred_locations: Precomputed result of _preferred_locations(user), if available
 
         Returns:
             True if job matches user preferences, False otherwise
@@ -48,14 +204,18 @@ class MatchingService:
             return True
 
         # Check location preferences - ONLY if user specified location preference
-        preferred_locations = preferences.get("locations", [])
+        if preferred_locations is None:
+            preferred_locations = self._preferred_locations(user)
         if preferred_locations:
             if not job.location:
                 # User wants specific locations but job has no location
                 return False
 
+            if job_location is None:
+                job_location = self._normalize_job_location(job)
+
             location_match = any(
-                self._location_matches(job.location, pref_location)
+                self._location_matches(job_location, pref_location)
                 for pref_location in preferred_locations
             )
             if not location_match:
@@ -90,34 +250,70 @@ class MatchingService:
         # All specified preferences matched
         return True
 
-    def _location_matches(self, job_location: str, preferred_location: str) -> bool:
+    def _normalize_job_location(self, job: JobPosting) -> Tuple[str, bool]:
+        """
+        Lowercase a job's location once for matching against many users.
+
+        Args:
+            job: JobPosting instance
+
+        Returns:
+            (normalized location, whether it mentions "remote")
+        """
+        location = (job.location or "").lower().strip()
+        return location, "remote" in location
+
+    def _preferred_locations(self, user: User) -> List[Tuple[str, bool]]:
+        """
+        Get a user's preferred locations, normalized the same way as job locations.
+
+        Args:
+            user: User instance with preferences
+
+        Returns:
+            List of (normalized location, whether it mentions "remote")
+        """
+        locations = []
+        for pref_location in (user.preferences or {}).get("locations", []):
+            pref_location = pref_location.lower().strip()
+            locations.append((pref_location, "remote" in pref_location))
+        return locations
+
+    def _preferred_locations_by_user(self, users: List[User]) -> Dict:
+        """
+        Normalize every user's preferred locations once for a matching call.
+        Kept per call rather than on the User instances, so it can't go stale
+        when preferences change within the session.
+
+        Args:
+            users: User instances with preferences
+
+        Returns:
+            Dict mapping user id to the result of _preferred_locations(user)
+        """
+        return {user.id: self._preferred_locations(user) for user in users}
+
+    def _location_matches(self, job_location: Tuple[str, bool], preferred_location: Tuple[str, bool]) -> bool:
         """
         Check if job location matches preferred location.
         Supports exact match and "Remote" keyword matching.
 
         Args:
-            job_location: Job location string
-            preferred_location: User's preferred location string
+            job_location: Normalized job location from _normalize_job_location
+            preferred_location: Normalized preferred location from _preferred_locations
 
         Returns:
             True if locations match
         """
-        job_location = job_location.lower().strip()
-        preferred_location = preferred_location.lower().strip()
-
-        # Exact match
-        if job_location == preferred_location:
-            return True
+        job_loc, job_is_remote = job_location
+        pref_loc, pref_is_remote = preferred_location
 
         # Remote matching
-        if "remote" in preferred_location and "remote" in job_location:
-            return True
-
-        # Partial match (e.g., "San Francisco" matches "San Francisco, CA")
-        if preferred_location in job_location or job_location in preferred_location:
+        if pref_is_remote and job_is_remote:
             return True
 
-        return False
+        # Exact or partial match (e.g., "San Francisco" matches "San Francisco, CA")
+        return pref_loc in job_loc or job_loc in pref_loc
 
     async def queue_notifications(self, users: List[User], job: JobPosting, db: Session):
         """
@@ -128,23 +324,29 @@ class MatchingService:
             job: JobPosting instance
             db: Database session
         """
-        print(f"[MATCHING] Queueing notifications for {len(users)} users")
+        if not users:
+            return
 
+        now = datetime.utcnow()
+        rows = []
         for user in users:
-            # Get user's notification channels
-            channels = user.notification_channels or ["email"]
-            channels_str = ",".join(channels)
-
-            # Create notification queue entry
-            queue_entry = NotificationQueue(
-                user_id=user.id,
-                job_posting_id=job.id,
-                channels=channels_str,
-                priority=0,
-                created_at=datetime.utcnow()
-            )
-
-            db.add(queue_entry)
-
-        db.commit()
-        print(f"[MATCHING] Queued notifications for {len(users)} users")
+            # Get user's notification channels (unknown names would never be drained from the queue)
+            channels = [c for c in (user.notification_channels or ["email"]) if c in _QUEUE_CHANNELS]
+            if not channels:
+                continue
+
+            rows.append({
+                "user_id": user.id,
+                "job_posting_id": job.id,
+                "channels": channels,
+                "priority": 0,
+                "created_at": now
+            })
+
+        if not rows:
+            return
+
+        # Single executemany INSERT instead of one unit-of-work add per user
+        # Caller commits (together with the page's jobs)
+        db.execute(insert(NotificationQueue), rows)
+        logger.info("[MATCHING] Queued notifications for %s users", len(rows))
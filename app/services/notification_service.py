@@ -1,83 +1,379 @@
-from typing import List
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import uuid
 import aiosmtplib
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from discord_webhook import DiscordWebhook, DiscordEmbed
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import DateTime, func, insert, select
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timedelta
+from jinja2 import Environment
 
 from app.config import settings
+from app.database import SessionManager
 from app.models import User, JobPosting, Notification, NotificationQueue, NotificationChannel, NotificationStatus
+from app.utils import CircuitBreaker, CircuitOpenError
+
+
+logger = logging.getLogger(__name__)
+
+
+# Max concurrent sends per channel (SMTP is bounded by its connection pool)
+DISCORD_CONCURRENCY = 10
+DASHBOARD_CONCURRENCY = 50
+
+# SMTP connections kept open for a queue run, and messages sent on one before it's recycled
+SMTP_POOL_SIZE = 5
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+
+# Retry policy for transient send failures (exponential backoff with full jitter)
+SEND_MAX_ATTEMPTS = 5
+SEND_MAX_BACKOFF = 32
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Minutes before an entry that errored is picked up again
+QUEUE_RETRY_DELAY_MINUTES = 5
+
+# Consecutive failures before a destination's breaker opens, and seconds until it goes half-open
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60
+
+_backoff = wait_random_exponential(multiplier=1, max=SEND_MAX_BACKOFF)
+
+
+def _is_smtp_server_error(exc: BaseException) -> bool:
+    """
+    Whether an SMTP failure points at the server rather than one message or recipient.
+    Only these count toward the SMTP breaker; a refused address says nothing about the host.
+    """
+    # OSError covers connect/disconnect/timeouts; 421 is "service not available"
+    if isinstance(exc, (OSError, aiosmtplib.SMTPAuthenticationError, aiosmtplib.SMTPHeloError)):
+        return True
+    return isinstance(exc, aiosmtplib.SMTPResponseException) and exc.code == 421
+
+
+def _is_webhook_server_error(exc: BaseException) -> bool:
+    """
+    Whether a webhook failure points at the endpoint being down or overloaded
+    (connection errors, 429, 5xx) rather than a bad request.
+    """
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in RETRYABLE_STATUS_CODES
+
+
+def _utc_now():
+    """Database-side current time in UTC, matching the naive UTC timestamps stored in the queue."""
+    return func.timezone("utc", func.now(), type_=DateTime)
+
+
+def _wait_with_retry_after(retry_state) -> float:
+    """
+    Tenacity wait strategy: use the response's Retry-After header when present,
+    otherwise jittered exponential backoff.
+    """
+    outcome = retry_state.outcome
+    if outcome is not None and not outcome.failed:
+        retry_after = outcome.result().headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), SEND_MAX_BACKOFF)
+            except ValueError:
+                pass
+
+    return _backoff(retry_state)
+
+
+def _retrying(retry) -> AsyncRetrying:
+    """
+    Build a retry controller for one send. A fresh instance per call keeps
+    concurrent sends from sharing retry state.
+
+    Args:
+        retry: Tenacity retry condition
+
+    Returns:
+        AsyncRetrying that returns (or raises) the last outcome once attempts run out
+    """
+    return AsyncRetrying(
+        stop=stop_after_attempt(SEND_MAX_ATTEMPTS),
+        wait=_wait_with_retry_after,
+        retry=retry,
+        retry_error_callback=lambda retry_state: retry_state.outcome.result()
+    )
+
+
+# Email body, compiled once; autoescape keeps job fields from injecting HTML
+_EMAIL_TEMPLATE = Environment(autoescape=True).from_string("""
+<html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <h2 style="color: #2c3e50;">New Job Match!</h2>
+
+        <div style="background-color: #f8f9fa; padding: 20px; border-radius: 5px; margin: 20px 0;">
+            <h3 style="margin-top: 0; color: #3498db;">{{ job.title }}</h3>
+            <p><strong>Company:</strong> {{ company }}</p>
+            <p><strong>Location:</strong> {{ job.location or 'Not specified' }}</p>
+            <p><strong>Job Type:</strong> {{ job.job_type or 'Not specified' }}</p>
+            <p><strong>Experience Level:</strong> {{ job.experience_level or 'Not specified' }}</p>
+        </div>
+
+        <div style="margin: 20px 0;">
+            <h4>Description:</h4>
+            <p>{{ job.description or 'No description available' }}</p>
+        </div>
+
+        <div style="margin: 20px 0;">
+            <h4>Requirements:</h4>
+            <p>{{ job.requirements or 'No requirements specified' }}</p>
+        </div>
+
+        <div style="margin: 30px 0;">
+            <a href="{{ job.url }}"
+               style="background-color: #3498db; color: white; padding: 12px 24px;
+                      text-decoration: none; border-radius: 5px; display: inline-block;">
+                View Job Posting
+            </a>
+        </div>
+
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+
+        <p style="font-size: 12px; color: #7f8c8d;">
+            You received this email because it matches your job preferences.
+            To update your preferences or unsubscribe, please contact support.
+        </p>
+    </body>
+</html>
+""")
 
 
 class NotificationService:
-    async def process_notification_queue(self, db: Session):
+    def __init__(self):
+        # Pool slots start empty (None) and are connected on first use
+        self._smtp_pool: asyncio.Queue = asyncio.Queue(maxsize=SMTP_POOL_SIZE)
+        for _ in range(SMTP_POOL_SIZE):
+            self._smtp_pool.put_nowait(None)
+        self._smtp_sent_counts = {}
+
+        self._discord_sem = asyncio.Semaphore(DISCORD_CONCURRENCY)
+        self._dashboard_sem = asyncio.Semaphore(DASHBOARD_CONCURRENCY)
+
+        # Shared client so webhook posts reuse pooled keep-alive connections
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            timeout=10
+        )
+
+        # Circuit breakers keyed by webhook URL / SMTP host
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+        # Email HTML / Discord payload per (channel, job id); many users often match one job
+        self._job_render_cache: Dict[Tuple[str, uuid.UUID], Any] = {}
+
+    async def process_notification_queue(self):
         """
         Process all pending notifications in the queue.
 
-        Args:
-            db: Database session
+        Each channel is drained by its own task with its own session, so email,
+        Discord and dashboard sends proceed independently.
         """
-        print("[NOTIFICATION] Processing notification queue...")
+        logger.info("[NOTIFICATION] Processing notification queue...")
+
+        # Jobs may have changed since the last run
+        self._job_render_cache.clear()
+
+        processed_count = 0
 
-        # Get all pending notifications from queue
-        queue_entries = db.query(NotificationQueue).all()
+        while True:
+            # Rows locked by a sibling channel task are skipped and picked up in the next round
+            counts = await asyncio.gather(
+                *(self._process_channel(channel) for channel in NotificationChannel)
+            )
+            if not sum(counts):
+                break
+            processed_count += sum(counts)
 
-        if not queue_entries:
-            print("[NOTIFICATION] No notifications in queue")
+        if not processed_count:
+            logger.info("[NOTIFICATION] No notifications in queue")
             return
 
-        print(f"[NOTIFICATION] Processing {len(queue_entries)} queue entries")
+        logger.info("[NOTIFICATION] Queue processing complete")
 
-        for entry in queue_entries:
-            try:
-                # Get user and job
-                user = db.query(User).filter(User.id == entry.user_id).first()
-                job = db.query(JobPosting).filter(JobPosting.id == entry.job_posting_id).first()
-
-                if not user or not job:
-                    print(f"[NOTIFICATION] User or job not found for queue entry {entry.id}")
-                    db.delete(entry)
-                    continue
-
-                # Parse channels
-                channels = entry.channels.split(",")
-
-                # Send notification to each channel
-                for channel in channels:
-                    channel = channel.strip()
-                    if channel == "email":
-                        await self.send_email_notification(user, job, db)
-                    elif channel == "discord":
-                        await self.send_discord_notification(user, job, db)
-                    elif channel == "dashboard":
-                        await self.send_dashboard_notification(user, job, db)
-
-                # Remove from queue after processing
-                db.delete(entry)
+    async def _process_channel(self, channel: NotificationChannel) -> int:
+        """
+        Send all due, claimable queue entries that still need the given channel.
+
+        Args:
+            channel: Channel to send on
+
+        Returns:
+            Number of entries handled
+        """
+        processed_count = 0
+
+        with SessionManager() as db:
+            while True:
+                # Claim a batch of entries; SKIP LOCKED lets concurrent workers take disjoint batches.
+                # User, job and company are joined in so the sends below issue no per-entry queries.
+                # contains() compiles to channels @> ARRAY[...], which can use the GIN index.
+                stmt = (
+                    select(NotificationQueue)
+                    .options(
+                        joinedload(NotificationQueue.user),
+                        joinedload(NotificationQueue.job_posting).joinedload(JobPosting.career_page)
+                    )
+                    .where(
+                        NotificationQueue.channels.contains([channel.value]),
+                        NotificationQueue.next_attempt_at <= _utc_now()
+                    )
+                    .order_by(NotificationQueue.priority.desc(), NotificationQueue.created_at)
+                    .limit(settings.notification_batch_size)
+                    .with_for_update(skip_locked=True, of=NotificationQueue)
+                )
+                # Memory stays O(batch size): only one claimed batch is held at a time
+                queue_entries = db.scalars(stmt).unique().all()
+
+                if not queue_entries:
+                    break
+
+                logger.info("[NOTIFICATION] Processing %s %s queue entries", len(queue_entries), channel.value)
+
+                # Dispatch the batch concurrently; the per-channel limits cap load on SMTP/Discord
+                results = await asyncio.gather(
+                    *(self._send_to_channel(channel, entry) for entry in queue_entries),
+                    return_exceptions=True
+                )
+
+                notifications = []
+                processed_ids = []
+                failed_entries = []
+                for entry, result in zip(queue_entries, results):
+                    if isinstance(result, Exception):
+                        logger.error("[NOTIFICATION] Error processing queue entry %s: %s", entry.id, result)
+                        failed_entries.append(entry)
+                        continue
+
+                    if result is not None:
+                        notifications.append(result)
+                    processed_ids.append(entry.id)
+
+                # Errored sends are retried after a delay that applies to this channel only:
+                # an entry still waiting on other channels has this channel split off into
+                # its own delayed row, so the other channels stay due
+                retry_at = _utc_now() + timedelta(minutes=QUEUE_RETRY_DELAY_MINUTES)
+                delayed_ids = [entry.id for entry in failed_entries if len(entry.channels) == 1]
+                split_entries = [entry for entry in failed_entries if len(entry.channels) > 1]
+
+                if split_entries:
+                    db.execute(
+                        insert(NotificationQueue).values(next_attempt_at=retry_at),
+                        [
+                            {
+                                "user_id": entry.user_id,
+                                "job_posting_id": entry.job_posting_id,
+                                "channels": [channel.value],
+                                "priority": entry.priority,
+                                "created_at": entry.created_at
+                            }
+                            for entry in split_entries
+                        ]
+                    )
+
+                # Record notifications, then drop this channel from the processed and split
+                # entries and remove entries that have no channels left
+                if notifications:
+                    db.bulk_save_objects(notifications)
+                done_ids = processed_ids + [entry.id for entry in split_entries]
+                if done_ids:
+                    db.query(NotificationQueue).filter(
+                        NotificationQueue.id.in_(done_ids)
+                    ).update(
+                        {NotificationQueue.channels: func.array_remove(NotificationQueue.channels, channel.value)},
+                        synchronize_session=False
+                    )
+                    db.query(NotificationQueue).filter(
+                        NotificationQueue.id.in_(done_ids),
+                        func.cardinality(NotificationQueue.channels) == 0
+                    ).delete(synchronize_session=False)
+
+                # Entries waiting on this channel alone are pushed back as a whole
+                if delayed_ids:
+                    db.query(NotificationQueue).filter(
+                        NotificationQueue.id.in_(delayed_ids)
+                    ).update(
+                        {NotificationQueue.next_attempt_at: retry_at},
+                        synchronize_session=False
+                    )
+
+                # One commit per batch; also releases the row locks
                 db.commit()
+                processed_count += len(processed_ids)
+
+        return processed_count
+
+    async def _send_to_channel(self, channel: NotificationChannel, entry: NotificationQueue) -> Optional[Notification]:
+        """
+        Send one queue entry on one channel.
+
+        Args:
+            channel: Channel to send on
+            entry: NotificationQueue instance with user and job loaded
 
-            except Exception as e:
-                print(f"[NOTIFICATION] Error processing queue entry {entry.id}: {str(e)}")
-                continue
+        Returns:
+            Notification record for the send, or None if nothing was sent
+        """
+        # Get user and job (already loaded with the entry)
+        user = entry.user
+        job = entry.job_posting
 
-        print("[NOTIFICATION] Queue processing complete")
+        if not user or not job:
+            logger.warning("[NOTIFICATION] User or job not found for queue entry %s", entry.id)
+            return None
 
-    async def send_email_notification(self, user: User, job: JobPosting, db: Session):
+        if channel == NotificationChannel.EMAIL:
+            return await self.send_email_notification(user, job)
+        if channel == NotificationChannel.DISCORD:
+            return await self.send_discord_notification(user, job)
+        return await self.send_dashboard_notification(user, job)
+
+    async def send_email_notification(self, user: User, job: JobPosting) -> Notification:
         """
         Send email notification to user about new job.
 
         Args:
             user: User instance
             job: JobPosting instance
-            db: Database session
+
+        Returns:
+            Unsaved Notification record describing the outcome
+
+        Raises:
+            CircuitOpenError: The SMTP breaker is open; the entry should be retried later
         """
-        print(f"[NOTIFICATION] Sending email to {user.email} for job {job.title}")
+        logger.debug("[NOTIFICATION] Sending email to %s for job %s", user.email, job.title)
+
+        breaker = self._get_breaker(f"smtp:{settings.smtp_host}")
+        if not breaker.allow_request():
+            # Raise so the entry stays queued and is retried after next_attempt_at
+            raise CircuitOpenError(f"SMTP circuit open for {settings.smtp_host}")
 
         try:
             # Create email content
             subject = f"New Job Match: {job.title} at {job.career_page.company_name}"
-            html_body = self._create_email_html(user, job)
+            # Rendered once per job; the body has nothing user-specific
+            html_body = self._job_render_cache.get(("email", job.id))
+            if html_body is None:
+                html_body = self._create_email_html(user, job)
+                self._job_render_cache[("email", job.id)] = html_body
 
             # Create message
             message = MIMEMultipart("alternative")
@@ -88,15 +384,11 @@ class NotificationService:
             html_part = MIMEText(html_body, "html")
             message.attach(html_part)
 
-            # Send email
-            await aiosmtplib.send(
-                message,
-                hostname=settings.smtp_host,
-                port=settings.smtp_port,
-                username=settings.smtp_username,
-                password=settings.smtp_password,
-                start_tls=True
-            )
+            # Send email over a pooled connection, retrying dropped connections
+            await _retrying(
+                retry_if_exception_type((aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError))
+            )(self._send_smtp, message)
+            breaker.record_success()
 
             # Record notification
             notification = Notification(
@@ -106,13 +398,13 @@ class NotificationService:
                 status=NotificationStatus.SENT,
                 sent_at=datetime.utcnow()
             )
-            db.add(notification)
-            db.commit()
-
-            print(f"[NOTIFICATION] Email sent successfully to {user.email}")
+            logger.info("[NOTIFICATION] Email sent successfully to %s", user.email)
+            return notification
 
         except Exception as e:
-            print(f"[NOTIFICATION] Failed to send email to {user.email}: {str(e)}")
+            logger.error("[NOTIFICATION] Failed to send email to %s: %s", user.email, e)
+            if _is_smtp_server_error(e):
+                breaker.record_failure()
 
             # Record failed notification
             notification = Notification(
@@ -122,8 +414,123 @@ class NotificationService:
                 status=NotificationStatus.FAILED,
                 error_message=str(e)
             )
-            db.add(notification)
-            db.commit()
+            return notification
+
+    def _get_breaker(self, key: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker for a destination, creating it on first use.
+
+        Args:
+            key: Destination key (webhook URL or SMTP host)
+
+        Returns:
+            CircuitBreaker instance
+        """
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+            self._breakers[key] = breaker
+        return breaker
+
+    async def _send_smtp(self, message: MIMEMultipart):
+        """
+        Send one message over a pooled SMTP connection.
+
+        Args:
+            message: Email message to send
+        """
+        client = await self._acquire_smtp()
+        healthy = False
+        try:
+            await client.send_message(message)
+            healthy = True
+        finally:
+            await self._release_smtp(client, healthy)
+
+    async def _post_webhook(self, url: str, payload: dict) -> httpx.Response:
+        """
+        POST a Discord webhook payload, bounded by the Discord semaphore.
+
+        Args:
+            url: Webhook URL
+            payload: JSON body
+
+        Returns:
+            HTTP response
+        """
+        async with self._discord_sem:
+            return await self._http.post(url, json=payload)
+
+    async def _acquire_smtp(self) -> aiosmtplib.SMTP:
+        """
+        Take an SMTP connection from the pool, connecting and logging in if the slot is empty.
+
+        Returns:
+            Connected, authenticated SMTP client
+        """
+        client = await self._smtp_pool.get()
+        if client is not None and client.is_connected:
+            return client
+
+        try:
+            client = aiosmtplib.SMTP(
+                hostname=settings.smtp_host,
+                port=settings.smtp_port,
+                start_tls=True
+            )
+            await client.connect()
+            await client.login(settings.smtp_username, settings.smtp_password)
+        except Exception:
+            # Give the slot back so other senders can retry the connection
+            self._smtp_pool.put_nowait(None)
+            raise
+
+        self._smtp_sent_counts[client] = 0
+        return client
+
+    async def _release_smtp(self, client: aiosmtplib.SMTP, healthy: bool):
+        """
+        Return an SMTP connection to the pool, closing it if it errored or hit its message limit.
+
+        Args:
+            client: SMTP client taken with _acquire_smtp
+            healthy: Whether the last send on it succeeded
+        """
+        self._smtp_sent_counts[client] = self._smtp_sent_counts.get(client, 0) + 1
+
+        if not healthy or self._smtp_sent_counts[client] >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+            await self._close_smtp(client)
+            client = None
+
+        self._smtp_pool.put_nowait(client)
+
+    async def _close_smtp(self, client: aiosmtplib.SMTP):
+        """
+        Close an SMTP connection, falling back to dropping the socket if QUIT fails.
+
+        Args:
+            client: SMTP client to close
+        """
+        self._smtp_sent_counts.pop(client, None)
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+    async def close_all(self):
+        """
+        Close all pooled connections. Call once the queue run is finished.
+        """
+        await self._http.aclose()
+
+        clients = []
+        while not self._smtp_pool.empty():
+            clients.append(self._smtp_pool.get_nowait())
+
+        for client in clients:
+            if client is not None:
+                await self._close_smtp(client)
+            self._smtp_pool.put_nowait(None)
 
     def _create_email_html(self, user: User, job: JobPosting) -> str:
         """
@@ -136,90 +543,47 @@ class NotificationService:
         Returns:
             HTML string
         """
-        html = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <h2 style="color: #2c3e50;">New Job Match!</h2>
-
-                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 5px; margin: 20px 0;">
-                    <h3 style="margin-top: 0; color: #3498db;">{job.title}</h3>
-                    <p><strong>Company:</strong> {job.career_page.company_name}</p>
-                    <p><strong>Location:</strong> {job.location or 'Not specified'}</p>
-                    <p><strong>Job Type:</strong> {job.job_type or 'Not specified'}</p>
-                    <p><strong>Experience Level:</strong> {job.experience_level or 'Not specified'}</p>
-                </div>
-
-                <div style="margin: 20px 0;">
-                    <h4>Description:</h4>
-                    <p>{job.description or 'No description available'}</p>
-                </div>
-
-                <div style="margin: 20px 0;">
-                    <h4>Requirements:</h4>
-                    <p>{job.requirements or 'No requirements specified'}</p>
-                </div>
-
-                <div style="margin: 30px 0;">
-                    <a href="{job.url}"
-                       style="background-color: #3498db; color: white; padding: 12px 24px;
-                              text-decoration: none; border-radius: 5px; display: inline-block;">
-                        View Job Posting
-                    </a>
-                </div>
-
-                <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-
-                <p style="font-size: 12px; color: #7f8c8d;">
-                    You received this email because it matches your job preferences.
-                    To update your preferences or unsubscribe, please contact support.
-                </p>
-            </body>
-        </html>
-        """
-        return html
+        return _EMAIL_TEMPLATE.render(user=user, job=job, company=job.career_page.company_name)
 
-    async def send_discord_notification(self, user: User, job: JobPosting, db: Session):
+    async def send_discord_notification(self, user: User, job: JobPosting) -> Optional[Notification]:
         """
         Send Discord webhook notification to user about new job.
 
         Args:
             user: User instance
             job: JobPosting instance
-            db: Database session
-        """
-        print(f"[NOTIFICATION] Sending Discord notification for job {job.title}")
 
-        if not user.discord_webhook_url:
-            print(f"[NOTIFICATION] User {user.email} has no Discord webhook URL")
-            return
-
-        try:
-            # Create Discord webhook
-            webhook = DiscordWebhook(url=user.discord_webhook_url)
-
-            # Create embed
-            embed = DiscordEmbed(
-                title=f"🎯 New Job Match: {job.title}",
-                description=job.description or "No description available",
-                color=0x3498db
-            )
-
-            embed.add_embed_field(name="Company", value=job.career_page.company_name, inline=True)
-            embed.add_embed_field(name="Location", value=job.location or "Not specified", inline=True)
-            embed.add_embed_field(name="Job Type", value=job.job_type or "Not specified", inline=True)
-            embed.add_embed_field(name="Experience", value=job.experience_level or "Not specified", inline=True)
-
-            if job.requirements:
-                embed.add_embed_field(name="Requirements", value=job.requirements[:1024], inline=False)
+        Returns:
+            Unsaved Notification record describing the outcome, or None if the
+            user has no webhook configured
 
-            embed.add_embed_field(name="🔗 Apply", value=f"[View Job Posting]({job.url})", inline=False)
+        Raises:
+            CircuitOpenError: The webhook's breaker is open; the entry should be retried later
+        """
+        logger.debug("[NOTIFICATION] Sending Discord notification for job %s", job.title)
 
-            embed.set_footer(text=f"Posted: {job.first_seen_at.strftime('%Y-%m-%d %H:%M')}")
+        if not user.discord_webhook_url:
+            logger.info("[NOTIFICATION] User %s has no Discord webhook URL", user.email)
+            return None
 
-            webhook.add_embed(embed)
+        breaker = self._get_breaker(user.discord_webhook_url)
+        if not breaker.allow_request():
+            # Raise so the entry stays queued and is retried after next_attempt_at
+            raise CircuitOpenError(f"Discord webhook circuit open for {user.email}")
 
-            # Send webhook
-            response = webhook.execute()
+        try:
+            payload = self._job_render_cache.get(("discord", job.id))
+            if payload is None:
+                payload = self._create_discord_payload(job)
+                self._job_render_cache[("discord", job.id)] = payload
+
+            # Send webhook, retrying connection errors, 429s and 5xx
+            response = await _retrying(
+                retry_if_exception_type(httpx.TransportError)
+                | retry_if_result(lambda r: r.status_code in RETRYABLE_STATUS_CODES)
+            )(self._post_webhook, user.discord_webhook_url, payload)
+            response.raise_for_status()
+            breaker.record_success()
 
             # Record notification
             notification = Notification(
@@ -229,13 +593,13 @@ class NotificationService:
                 status=NotificationStatus.SENT,
                 sent_at=datetime.utcnow()
             )
-            db.add(notification)
-            db.commit()
-
-            print(f"[NOTIFICATION] Discord notification sent successfully")
+            logger.info("[NOTIFICATION] Discord notification sent successfully")
+            return notification
 
         except Exception as e:
-            print(f"[NOTIFICATION] Failed to send Discord notification: {str(e)}")
+            logger.error("[NOTIFICATION] Failed to send Discord notification: %s", e)
+            if _is_webhook_server_error(e):
+                breaker.record_failure()
 
             # Record failed notification
             notification = Notification(
@@ -245,36 +609,81 @@ class NotificationService:
                 status=NotificationStatus.FAILED,
                 error_message=str(e)
             )
-            db.add(notification)
-            db.commit()
+            return notification
+
+    def _create_discord_payload(self, job: JobPosting) -> dict:
+        """
+        Create the Discord webhook payload for a job notification.
+
+        Args:
+            job: JobPosting instance
 
-    async def send_dashboard_notification(self, user: User, job: JobPosting, db: Session):
+        Returns:
+            Webhook JSON body with a single embed
+        """
+        # Build the embed payload (same fields the webhook library produced)
+        fields = [
+            {"name": "Company", "value": job.career_page.company_name, "inline": True},
+            {"name": "Location", "value": job.location or "Not specified", "inline": True},
+            {"name": "Job Type", "value": job.job_type or "Not specified", "inline": True},
+            {"name": "Experience", "value": job.experience_level or "Not specified", "inline": True},
+        ]
+
+        if job.requirements:
+            fields.append({"name": "Requirements", "value": job.requirements[:1024], "inline": False})
+
+        fields.append({"name": "🔗 Apply", "value": f"[View Job Posting]({job.url})", "inline": False})
+
+        payload = {
+            "embeds": [{
+                "title": f"🎯 New Job Match: {job.title}",
+                "description": job.description or "No description available",
+                "color": 0x3498db,
+                "fields": fields,
+                "footer": {"text": f"Posted: {job.first_seen_at.strftime('%Y-%m-%d %H:%M')}"}
+            }]
+        }
+        return payload
+
+    async def send_dashboard_notification(self, user: User, job: JobPosting) -> Notification:
         """
         Create dashboard notification record (for web dashboard display).
 
         Args:
             user: User instance
             job: JobPosting instance
-            db: Database session
+
+        Returns:
+            Unsaved Notification record
         """
-        print(f"[NOTIFICATION] Creating dashboard notification for user {user.email}")
+        logger.debug("[NOTIFICATION] Creating dashboard notification for user %s", user.email)
 
         try:
-            # Just create notification record - the dashboard will query these
+            async with self._dashboard_sem:
+                # Just create notification record - the dashboard will query these
+                notification = Notification(
+                    user_id=user.id,
+                    job_posting_id=job.id,
+                    channel=NotificationChannel.DASHBOARD,
+                    status=NotificationStatus.SENT,
+                    sent_at=datetime.utcnow()
+                )
+                logger.debug("[NOTIFICATION] Dashboard notification created")
+
+                # TODO: In future, send WebSocket message to connected clients
+                # await websocket_manager.send_to_user(user.id, notification_data)
+
+            return notification
+
+        except Exception as e:
+            logger.error("[NOTIFICATION] Failed to create dashboard notification: %s", e)
+
+            # Record failed notification
             notification = Notification(
                 user_id=user.id,
                 job_posting_id=job.id,
                 channel=NotificationChannel.DASHBOARD,
-                status=NotificationStatus.SENT,
-                sent_at=datetime.utcnow()
+                status=NotificationStatus.FAILED,
+                error_message=str(e)
             )
-            db.add(notification)
-            db.commit()
-
-            print(f"[NOTIFICATION] Dashboard notification created")
-
-            # TODO: In future, send WebSocket message to connected clients
-            # await websocket_manager.send_to_user(user.id, notification_data)
-
-        except Exception as e:
-            print(f"[NOTIFICATION] Failed to create dashboard notification: {str(e)}")
+            return notification
@@ -1,10 +1,16 @@
+import logging
 from typing import List, Dict
+import asyncio
 from datetime import datetime
 from firecrawl import FirecrawlApp
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models import CareerPage
+from app.utils import generate_simple_hash
+
+
+logger = logging.getLogger(__name__)
 
 
 class ScraperService:
@@ -22,7 +28,7 @@ class ScraperService:
         Returns:
             List of raw job data dictionaries from Firecrawl (in memory, not saved to DB yet)
         """
-        print(f"[SCRAPER] Starting scrape for {career_page.company_name} ({career_page.url})")
+        logger.info("[SCRAPER] Starting scrape for %s (%s)", career_page.company_name, career_page.url)
 
         try:
             # Use Firecrawl to scrape the career page
@@ -30,8 +36,10 @@ class ScraperService:
             scrape_config = career_page.scrape_config or {}
 
             if scrape_config.get("multi_page", False):
-                # Crawl multiple pages (handles pagination automatically)
-                result = self.firecrawl.crawl_url(
+                # Crawl multiple pages (handles pagination automatically).
+                # Firecrawl's client is blocking, so run it in a thread to keep the loop free.
+                result = await asyncio.to_thread(
+                    self.firecrawl.crawl_url,
                     career_page.url,
                     params={
                         "limit": scrape_config.get("page_limit", 10),
@@ -40,23 +48,23 @@ class ScraperService:
                 )
                 raw_jobs = self._extract_jobs_from_crawl(result, career_page)
             else:
-                # Single page scrape
-                result = self.firecrawl.scrape_url(
+                # Single page scrape (blocking client, run in a thread)
+                result = await asyncio.to_thread(
+                    self.firecrawl.scrape_url,
                     career_page.url,
                     params={"formats": ["markdown", "html"]}
                 )
                 raw_jobs = self._extract_jobs_from_scrape(result, career_page)
 
-            print(f"[SCRAPER] Found {len(raw_jobs)} job listings for {career_page.company_name}")
+            logger.info("[SCRAPER] Found %s job listings for %s", len(raw_jobs), career_page.company_name)
 
-            # Update last_scraped_at
+            # Update last_scraped_at (committed by the caller with the rest of the page)
             career_page.last_scraped_at = datetime.utcnow()
-            db.commit()
 
             return raw_jobs
 
         except Exception as e:
-            print(f"[SCRAPER] Error scraping {career_page.company_name}: {str(e)}")
+            logger.error("[SCRAPER] Error scraping %s: %s", career_page.company_name, e)
             return []
 
     def _extract_jobs_from_scrape(self, result: Dict, career_page: CareerPage) -> List[Dict]:
@@ -78,6 +86,7 @@ class ScraperService:
             "career_page_id": str(career_page.id),
             "company_name": career_page.company_name,
             "raw_content": result.get("markdown", ""),
+            "content_hash": generate_simple_hash(result.get("markdown", "")),
             "html_content": result.get("html", ""),
             "metadata": result.get("metadata", {}),
             "scraped_at": datetime.utcnow().isoformat()
@@ -108,6 +117,7 @@ class ScraperService:
                 "career_page_id": str(career_page.id),
                 "company_name": career_page.company_name,
                 "raw_content": page.get("markdown", ""),
+                "content_hash": generate_simple_hash(page.get("markdown", "")),
                 "html_content": page.get("html", ""),
                 "metadata": page.get("metadata", {}),
                 "scraped_at": datetime.utcnow().isoformat()
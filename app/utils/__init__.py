@@ -1,3 +1,5 @@
 from app.utils.hash import generate_job_external_id, generate_simple_hash
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.compression import compress_json, decompress_json
 
-__all__ = ["generate_job_external_id", "generate_simple_hash"]
+__all__ = ["generate_job_external_id", "generate_simple_hash", "CircuitBreaker", "CircuitOpenError", "compress_json", "decompress_json"]
@@ -0,0 +1,50 @@
+import time
+from typing import Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a destination whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-destination circuit breaker for outbound notification calls.
+
+    Opens after `failure_threshold` consecutive failures and rejects calls while open.
+    Once `reset_timeout` seconds have passed it goes half-open and lets a single trial
+    call through; success closes it again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call to the destination may go ahead.
+
+        Returns:
+            True if closed, or if half-open and this caller gets the trial call
+        """
+        if self.opened_at is None:
+            return True
+
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Half-open: re-arm the timer so concurrent callers stay rejected until the trial finishes
+            self.opened_at = time.monotonic()
+            return True
+
+        return False
+
+    def record_success(self):
+        """Close the breaker after a successful call."""
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        """Count a failed call, opening the breaker once the threshold is reached."""
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
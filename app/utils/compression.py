@@ -0,0 +1,34 @@
+from typing import Any
+
+import orjson
+import zstandard
+
+
+# zstd level 3: the library default, a good speed/ratio trade-off for HTML/markdown payloads
+ZSTD_LEVEL = 3
+
+
+def compress_json(value: Any) -> bytes:
+    """
+    Serialize a value to JSON and zstd-compress it.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        Compressed bytes (frame includes the content size)
+    """
+    return zstandard.compress(orjson.dumps(value), ZSTD_LEVEL)
+
+
+def decompress_json(data: bytes) -> Any:
+    """
+    Reverse of compress_json.
+
+    Args:
+        data: Bytes produced by compress_json
+
+    Returns:
+        Deserialized value
+    """
+    return orjson.loads(zstandard.decompress(data))
@@ -1,11 +1,14 @@
 import hashlib
 from typing import Dict
 
+import xxhash
+
 
 def generate_job_external_id(career_page_id: str, job_url: str, title: str) -> str:
     """
     Generate a unique external_id for a job posting using hash of key fields.
-    This helps identify duplicate jobs across scrapes.
+    This helps identify duplicate jobs across scrapes. The id is only ever
+    compared, so a fast non-cryptographic hash (xxh3-128) is used.
 
     Args:
         career_page_id: UUID of the career page
@@ -13,14 +16,12 @@ def generate_job_external_id(career_page_id: str, job_url: str, title: str) -> s
         title: Job title
 
     Returns:
-        SHA256 hash string as external_id
+        32-char xxh3-128 hex digest as external_id
     """
     # Combine key fields to create unique identifier
     unique_string = f"{career_page_id}:{job_url}:{title}".lower().strip()
 
-    # Generate SHA256 hash
-    hash_object = hashlib.sha256(unique_string.encode())
-    return hash_object.hexdigest()
+    return xxhash.xxh3_128_hexdigest(unique_string.encode("utf-8", "ignore"))
 
 
 def generate_simple_hash(text: str) -> str:
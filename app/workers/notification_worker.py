@@ -1,7 +1,11 @@
-from app.database import SessionLocal
+import logging
+
 from app.services.notification_service import NotificationService
 
 
+logger = logging.getLogger(__name__)
+
+
 class NotificationWorker:
     """
     Worker that processes the notification queue and sends notifications.
@@ -14,20 +18,27 @@ class NotificationWorker:
         """
         Process all pending notifications in the queue.
         """
-        print("\n" + "="*60)
-        print("[NOTIFICATION WORKER] Starting notification processing")
-        print("="*60 + "\n")
-
-        db = SessionLocal()
+        logger.debug("=" * 60)
+        logger.info("[NOTIFICATION WORKER] Starting notification processing")
+        logger.debug("=" * 60)
 
         try:
-            await self.notification_service.process_notification_queue(db)
+            await self.notification_service.process_notification_queue()
 
-            print("\n" + "="*60)
-            print("[NOTIFICATION WORKER] Notification processing complete")
-            print("="*60 + "\n")
+            logger.debug("=" * 60)
+            logger.info("[NOTIFICATION WORKER] Notification processing complete")
+            logger.debug("=" * 60)
 
         except Exception as e:
-            print(f"[NOTIFICATION WORKER] Error in notification pipeline: {str(e)}")
+            logger.error("[NOTIFICATION WORKER] Error in notification pipeline: %s", e)
+
         finally:
-            db.close()
+            await self.notification_service.close_all()
+
+
+async def run_notification_job():
+    """
+    Scheduler entrypoint for notification processing.
+    Module-level so the persistent jobstore can store it by reference.
+    """
+    await NotificationWorker().run_notification_pipeline()
@@ -1,13 +1,23 @@
+import logging
 from typing import List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime
 
-from app.database import SessionLocal
-from app.models import CareerPage, JobPosting
+from app.config import settings
+from app.database import SessionManager
+from app.logging_config import setup_logging
+from app.models import CareerPage, JobPosting, RawPageContent
 from app.services.scraper_service import ScraperService
 from app.services.llm_service import LLMService
 from app.services.matching_service import MatchingService
-from app.utils import generate_job_external_id
+from app.utils import compress_json, generate_job_external_id
+
+
+logger = logging.getLogger(__name__)
 
 
 class ScrapeWorker:
@@ -29,33 +39,58 @@ class ScrapeWorker:
         """
         Run the complete scrape pipeline for all active career pages.
         """
-        print("\n" + "="*60)
-        print("[WORKER] Starting scrape pipeline")
-        print("="*60 + "\n")
+        logger.debug("=" * 60)
+        logger.info("[WORKER] Starting scrape pipeline")
+        logger.debug("=" * 60)
 
-        db = SessionLocal()
+        # Drop expired LLM outputs; a failure here shouldn't stop the scrape
+        try:
+            purged = self.llm.purge_expired_cache()
+            logger.info("[WORKER] Purged %s expired LLM cache entries", purged)
+        except Exception as e:
+            logger.warning("[WORKER] LLM cache purge failed: %s", e)
 
         try:
             # Get all active career pages
-            career_pages = db.query(CareerPage).filter(CareerPage.is_active == True).all()
+            with SessionManager() as db:
+                career_page_ids = [
+                    row.id for row in db.query(CareerPage.id).filter(CareerPage.is_active == True)
+                ]
 
-            if not career_pages:
-                print("[WORKER] No active career pages found")
+            if not career_page_ids:
+                logger.info("[WORKER] No active career pages found")
                 return
 
-            print(f"[WORKER] Found {len(career_pages)} active career pages")
+            logger.info("[WORKER] Found %s active career pages", len(career_page_ids))
 
-            for career_page in career_pages:
-                await self.scrape_single_career_page(career_page, db)
+            # Scrape pages concurrently, bounded to respect Firecrawl rate limits
+            semaphore = asyncio.Semaphore(settings.scrape_concurrency)
 
-            print("\n" + "="*60)
-            print("[WORKER] Scrape pipeline complete")
-            print("="*60 + "\n")
+            async def run_one(career_page_id):
+                async with semaphore:
+                    # Own session per task; sessions aren't safe to share across concurrent tasks
+                    with SessionManager() as db:
+                        career_page = db.get(CareerPage, career_page_id)
+                        if career_page:
+                            await self.scrape_single_career_page(career_page, db)
+
+            results = await asyncio.gather(
+                *(run_one(career_page_id) for career_page_id in career_page_ids),
+                return_exceptions=True
+            )
+
+            # Page-level errors are logged inside scrape_single_career_page; anything
+            # here escaped it (e.g. the session failing to load the page)
+            for career_page_id, result in zip(career_page_ids, results):
+                if isinstance(result, Exception):
+                    logger.error("[WORKER] Error processing career page %s: %s", career_page_id, result)
+
+            logger.debug("=" * 60)
+            logger.info("[WORKER] Scrape pipeline complete")
+            logger.debug("=" * 60)
 
         except Exception as e:
-            print(f"[WORKER] Error in scrape pipeline: {str(e)}")
-        finally:
-            db.close()
+            logger.error("[WORKER] Error in scrape pipeline: %s", e)
 
     async def scrape_single_career_page(self, career_page: CareerPage, db: Session):
         """
@@ -73,115 +108,247 @@ class ScrapeWorker:
             career_page: CareerPage instance
             db: Database session
         """
-        print(f"\n[WORKER] Processing {career_page.company_name}")
-        print("-" * 60)
+        logger.info("[WORKER] Processing %s", career_page.company_name)
+        logger.debug("-" * 60)
 
         try:
-            # Step 1: Scrape the career page
-            raw_jobs = await self.scraper.scrape_career_page(career_page, db)
+            await self._process_career_page(career_page, db)
 
-            if not raw_jobs:
-                print(f"[WORKER] No jobs scraped from {career_page.company_name}")
-                return
+        except Exception as e:
+            db.rollback()
+            logger.error("[WORKER] Error processing %s: %s", career_page.company_name, e)
+
+    async def _process_career_page(self, career_page: CareerPage, db: Session):
+        """
+        Scrape, normalize, save and match one career page, committing once at the end.
+
+        Firecrawl and Ollama run first with no writes pending; all database writes then
+        happen in one short transaction. Pages run concurrently on blocking sessions, so
+        a row lock held across an await could stall the whole event loop.
 
-            # Step 2: Normalize each raw job with LLM
-            all_normalized_jobs = []
+        Args:
+            career_page: CareerPage instance
+            db: Database session
+        """
+        # Step 1: Scrape the career page
+        raw_jobs = await self.scraper.scrape_career_page(career_page, db)
+
+        all_normalized_jobs = []
+        raw_page_rows = []
+        if raw_jobs:
+            # Compress each scraped page for storage now, then free its HTML;
+            # nothing downstream reads it and the LLM step is slow
+            raw_page_rows = self.build_raw_page_rows(raw_jobs)
             for raw_job in raw_jobs:
-                normalized_jobs = await self.llm.normalize_job_data(raw_job)
+                raw_job.pop("html_content", None)
+
+            # Step 2: Normalize all raw jobs with LLM (concurrently, bounded)
+            for normalized_jobs in await self.llm.normalize_job_data_batch(raw_jobs):
                 all_normalized_jobs.extend(normalized_jobs)
 
-            if not all_normalized_jobs:
-                print(f"[WORKER] No jobs extracted by LLM from {career_page.company_name}")
-                return
+        # Nothing awaited from here on suspends (matching is CPU-only), so the
+        # transaction is opened and committed without yielding to other pages
+        await self._save_career_page(career_page, raw_page_rows, all_normalized_jobs, db)
+
+        # Also persists last_scraped_at set by the scraper
+        db.commit()
+
+    async def _save_career_page(self, career_page: CareerPage, raw_page_rows: List[dict],
+                                normalized_jobs: List[dict], db: Session):
+        """
+        Write a scraped page's raw pages and jobs and queue notifications, without committing.
 
-            print(f"[WORKER] LLM extracted {len(all_normalized_jobs)} jobs total")
+        Args:
+            career_page: CareerPage instance
+            raw_page_rows: Rows from build_raw_page_rows
+            normalized_jobs: Jobs extracted by the LLM
+            db: Database session
+        """
+        if not raw_page_rows:
+            logger.info("[WORKER] No jobs scraped from %s", career_page.company_name)
+            return
 
-            # Step 3: Check for duplicates and save new jobs
-            new_jobs_count = 0
-            for normalized_job in all_normalized_jobs:
-                new_job = await self.save_new_job(normalized_job, career_page.id, db)
-                if new_job:
-                    new_jobs_count += 1
+        # Store each scraped page once; jobs reference it by content hash
+        self.save_raw_pages(raw_page_rows, db)
 
-                    # Step 4: Match with users and queue notifications
-                    await self.process_new_job_notifications(new_job, db)
+        if not normalized_jobs:
+            logger.info("[WORKER] No jobs extracted by LLM from %s", career_page.company_name)
+            return
 
-            print(f"[WORKER] Saved {new_jobs_count} new jobs from {career_page.company_name}")
+        logger.info("[WORKER] LLM extracted %s jobs total", len(normalized_jobs))
 
-        except Exception as e:
-            print(f"[WORKER] Error processing {career_page.company_name}: {str(e)}")
+        # Step 3: Check for duplicates and save new jobs (one upsert for the whole page)
+        new_jobs = self.save_new_jobs(normalized_jobs, career_page.id, db)
 
-    async def save_new_job(self, normalized_job: dict, career_page_id: str, db: Session) -> JobPosting:
+        logger.info("[WORKER] Saved %s new jobs from %s", len(new_jobs), career_page.company_name)
+
+        # Step 4: Match with users and queue notifications
+        if new_jobs:
+            await self.process_new_jobs_notifications(new_jobs, db)
+
+    def build_raw_page_rows(self, raw_jobs: List[dict]) -> List[dict]:
         """
-        Save a normalized job to the database if it's new.
+        Build raw_page_contents rows (zstd-compressed Firecrawl data) for the scraped pages,
+        one per content hash.
 
         Args:
-            normalized_job: Normalized job dictionary
-            career_page_id: UUID of career page
-            db: Database session
+            raw_jobs: Raw job dictionaries from the scraper
 
         Returns:
-            JobPosting instance if new, None if duplicate
+            Rows ready for save_raw_pages
         """
-        # Generate external_id for deduplication
-        external_id = generate_job_external_id(
-            career_page_id=str(career_page_id),
-            job_url=normalized_job.get("url", ""),
-            title=normalized_job.get("title", "")
-        )
+        rows = {
+            raw_job["content_hash"]: {
+                "content_hash": raw_job["content_hash"],
+                "url": raw_job.get("url", ""),
+                "data": compress_json(raw_job),
+                "created_at": datetime.utcnow()
+            }
+            for raw_job in raw_jobs
+        }
+        return list(rows.values())
+
+    def save_raw_pages(self, rows: List[dict], db: Session):
+        """
+        Persist raw page rows, keyed by content hash.
+        Pages already stored (unchanged content) are skipped.
 
-        # Check if job already exists
-        existing_job = db.query(JobPosting).filter(
-            JobPosting.external_id == external_id
-        ).first()
-
-        if existing_job:
-            # Update last_seen_at for existing job
-            existing_job.last_seen_at = datetime.utcnow()
-            existing_job.is_active = True
-            db.commit()
-            return None
-
-        # Create new job posting
-        new_job = JobPosting(
-            career_page_id=career_page_id,
-            external_id=external_id,
-            title=normalized_job.get("title"),
-            location=normalized_job.get("location"),
-            job_type=normalized_job.get("job_type"),
-            experience_level=normalized_job.get("experience_level"),
-            description=normalized_job.get("description"),
-            requirements=normalized_job.get("requirements"),
-            url=normalized_job.get("url"),
-            raw_data=normalized_job.get("raw_data", {}),
-            normalized_at=datetime.utcnow(),
-            first_seen_at=datetime.utcnow(),
-            last_seen_at=datetime.utcnow(),
-            is_active=True
-        )
+        Args:
+            rows: Rows from build_raw_page_rows
+            db: Database session
+        """
+        stmt = insert(RawPageContent).on_conflict_do_nothing(index_elements=["content_hash"])
+        db.execute(stmt, rows)
 
-        db.add(new_job)
-        db.commit()
-        db.refresh(new_job)
+    def save_new_jobs(self, normalized_jobs: List[dict], career_page_id: str, db: Session) -> List[JobPosting]:
+        """
+        Save a career page's normalized jobs, returning the ones that are new.
+        Known jobs just get last_seen_at refreshed.
 
-        print(f"[WORKER] New job saved: {new_job.title}")
-        return new_job
+        Args:
+            normalized_jobs: Normalized job dictionaries
+            career_page_id: UUID of career page
+            db: Database session
 
-    async def process_new_job_notifications(self, job: JobPosting, db: Session):
+        Returns:
+            Newly inserted JobPosting instances
+        """
+        now = datetime.utcnow()
+
+        # Keyed by external_id: a page can list the same job twice
+        rows = {}
+        for normalized_job in normalized_jobs:
+            # Generate external_id for deduplication
+            external_id = generate_job_external_id(
+                career_page_id=str(career_page_id),
+                job_url=normalized_job.get("url", ""),
+                title=normalized_job.get("title", "")
+            )
+            raw_data = normalized_job.get("raw_data") or {}
+            rows[external_id] = {
+                "career_page_id": career_page_id,
+                "external_id": external_id,
+                "title": normalized_job.get("title"),
+                "location": normalized_job.get("location"),
+                "job_type": normalized_job.get("job_type"),
+                "experience_level": normalized_job.get("experience_level"),
+                "description": normalized_job.get("description"),
+                "requirements": normalized_job.get("requirements"),
+                "url": normalized_job.get("url"),
+                # Built server-side; no client JSON encoding per row
+                "raw_data": func.jsonb_build_object(
+                    "hash", raw_data.get("hash"),
+                    "url", raw_data.get("url")
+                ),
+                "raw_page_hash": normalized_job.get("raw_page_hash"),
+                "normalized_at": now,
+                "first_seen_at": now,
+                "last_seen_at": now,
+                "is_active": True
+            }
+
+        # One query for which of these jobs are already known. external_id already
+        # encodes the career page, so this stays an index-only scan on the covering index.
+        known_ids = {
+            row.external_id
+            for row in db.query(JobPosting.external_id).filter(JobPosting.external_id.in_(list(rows)))
+        }
+        to_touch = [external_id for external_id in rows if external_id in known_ids]
+        to_insert = [row for external_id, row in rows.items() if external_id not in known_ids]
+
+        # Refresh last_seen_at for known jobs in one UPDATE
+        if to_touch:
+            db.query(JobPosting).filter(JobPosting.external_id.in_(to_touch)).update(
+                {"last_seen_at": now, "is_active": True},
+                synchronize_session=False
+            )
+
+        # Insert only the new ones; DO NOTHING covers a concurrent insert of the same job
+        new_ids = []
+        if to_insert:
+            stmt = (
+                insert(JobPosting)
+                .values(to_insert)
+                .on_conflict_do_nothing(index_elements=["external_id"])
+                .returning(JobPosting.id)
+            )
+            new_ids = list(db.execute(stmt).scalars())
+
+        if not new_ids:
+            return []
+
+        new_jobs = db.query(JobPosting).filter(JobPosting.id.in_(new_ids)).all()
+        for new_job in new_jobs:
+            logger.info("[WORKER] New job saved: %s", new_job.title)
+
+        return new_jobs
+
+    async def process_new_jobs_notifications(self, jobs: List[JobPosting], db: Session):
         """
-        Match a new job with users and queue notifications.
+        Match new jobs with users and queue notifications.
 
         Args:
-            job: JobPosting instance
+            jobs: Newly saved JobPosting instances
             db: Database session
         """
-        # Find matching users
-        matching_users = await self.matcher.find_matching_users(job, db)
+        # Find matching users for all jobs in one pass
+        matches = await self.matcher.find_matching_users_bulk(jobs, db)
 
-        if not matching_users:
-            print(f"[WORKER] No matching users for job: {job.title}")
-            return
+        for job in jobs:
+            matching_users = matches.get(job.id, [])
+
+            if not matching_users:
+                logger.info("[WORKER] No matching users for job: %s", job.title)
+                continue
+
+            # Queue notifications for matching users
+            await self.matcher.queue_notifications(matching_users, job, db)
+            logger.info("[WORKER] Queued notifications for %s users for job: %s", len(matching_users), job.title)
+
+
+async def run_scrape_job():
+    """
+    Scheduler entrypoint for the scrape pipeline.
+    Module-level so the persistent jobstore can store it by reference.
+    """
+    await ScrapeWorker().run_scrape_pipeline()
+
+
+def run_scrape_job_sync():
+    """
+    Process-pool entrypoint for the scrape pipeline.
+    Runs the async pipeline on the child process's own event loop, keeping
+    scraping and LLM work off the API server's loop.
+    """
+    # Spawned child processes start with unconfigured logging
+    setup_logging()
+
+    async def main():
+        # Blocking Firecrawl calls run in the default executor; size it so concurrent
+        # page scrapes don't queue behind each other for a thread
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=settings.scrape_concurrency * 2)
+        )
+        await run_scrape_job()
 
-        # Queue notifications for matching users
-        await self.matcher.queue_notifications(matching_users, job, db)
-        print(f"[WORKER] Queued notifications for {len(matching_users)} users")
+    asyncio.run(main())
@@ -6,147 +6,198 @@ This script tests the scraper service in isolation to verify:
 2. Single page scraping
 3. Multi-page crawling
 4. Data extraction from scrape results
+
+Run it directly (python tests/test_scraper_service.py) or under pytest. Set
+JOBSCRAPER_NONINTERACTIVE=1 to skip the prompts; the multi-page crawl then runs.
 """
 
+from __future__ import annotations
+
 import asyncio
+import hashlib
 import sys
 import os
-from datetime import datetime
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import orjson
+import pytest
+import zstandard
+from sqlalchemy import select
+
 from app.services.scraper_service import ScraperService
 from app.models import CareerPage
 from app.database import SessionLocal, init_db
-from sqlalchemy.orm import Session
+from app.utils import compress_json, decompress_json
 
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
 
-async def test_scraper_single_page():
-    """Test scraping a single career page"""
-    print("\n" + "="*60)
-    print("TEST 1: Single Page Scraping")
-    print("="*60)
 
-    db = SessionLocal()
-    try:
-        # Create a test career page (or use existing one)
-        test_career_page = CareerPage(
-            company_name="Test Company",
-            url="https://jobs.ashbyhq.com/anthropic",  # Example career page
-            scrape_config={"multi_page": False},
-            is_active=True
-        )
-
-        # Check if it already exists
-        existing = db.query(CareerPage).filter(CareerPage.url == test_career_page.url).first()
-        if existing:
-            test_career_page = existing
-            print(f"✓ Using existing career page: {test_career_page.company_name}")
-        else:
-            db.add(test_career_page)
-            db.commit()
-            db.refresh(test_career_page)
-            print(f"✓ Created new career page: {test_career_page.company_name}")
-
-        # Initialize scraper service
-        scraper = ScraperService()
-        print("✓ ScraperService initialized")
-
-        # Scrape the career page
-        print(f"\nScraping URL: {test_career_page.url}")
-        raw_jobs = await scraper.scrape_career_page(test_career_page, db)
-
-        # Display results
-        print(f"\n✓ Scraping completed!")
-        print(f"  - Found {len(raw_jobs)} raw job entries")
-
-        if raw_jobs:
-            print("\n" + "-"*60)
-            print("Sample Raw Job Data:")
-            print("-"*60)
-            job = raw_jobs[0]
-            print(f"URL: {job.get('url')}")
-            print(f"Company: {job.get('company_name')}")
-            print(f"Career Page ID: {job.get('career_page_id')}")
-            print(f"Raw Content Length: {len(job.get('raw_content', ''))} chars")
-            print(f"HTML Content Length: {len(job.get('html_content', ''))} chars")
-            print(f"Scraped At: {job.get('scraped_at')}")
-            print(f"\nFirst 500 chars of content:")
-            print(job.get('raw_content', '')[:500])
-            print("-"*60)
-
-        return True, raw_jobs
+# Scrape results are cached on disk so repeat runs don't go back to Firecrawl
+SCRAPE_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "scrape"
+SCRAPE_CACHE_TTL = 86400
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
+# One scraper (and one Firecrawl client) shared by every test
+SCRAPER = ScraperService()
+
+
+@pytest.fixture(scope="module")
+def db():
+    """One database session shared by every test in this module; skips them if the database is down"""
+    try:
+        init_db()
     except Exception as e:
-        print(f"\n✗ Test failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return False, []
-    finally:
-        db.close()
+        pytest.skip(f"Database not available: {e}")
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def get_or_create_career_page(db: Session, url: str, **defaults) -> CareerPage:
+    """Return the career page for url, creating it from defaults on first use"""
+    career_page = db.execute(select(CareerPage).where(CareerPage.url == url)).scalar_one_or_none()
+    if career_page:
+        print(f"✓ Using existing career page: {career_page.company_name}")
+        return career_page
 
+    career_page = CareerPage(url=url, **defaults)
+    db.add(career_page)
+    db.commit()
+    print(f"✓ Created new career page: {career_page.company_name}")
+    return career_page
 
-async def test_scraper_multi_page():
+
+async def cached_scrape(scraper: ScraperService, career_page: CareerPage, db: Session,
+                        ttl: int = SCRAPE_CACHE_TTL) -> list:
+    """
+    scraper.scrape_career_page with a disk cache keyed by URL and scrape config.
+    A cache file younger than ttl is returned without calling Firecrawl.
+    """
+    key_source = career_page.url.encode() + orjson.dumps(career_page.scrape_config or {}, option=orjson.OPT_SORT_KEYS)
+    cache_path = SCRAPE_CACHE_DIR / f"{hashlib.sha256(key_source).hexdigest()}.json.zst"
+
+    try:
+        if time.time() - cache_path.stat().st_mtime < ttl:
+            raw_jobs = decompress_json(cache_path.read_bytes())
+            print(f"✓ Using cached scrape from {cache_path.name}")
+            return raw_jobs
+    except (OSError, ValueError, zstandard.ZstdError):
+        pass  # Missing, stale or corrupt cache: scrape for real
+
+    raw_jobs = await scraper.scrape_career_page(career_page, db)
+
+    # Failed scrapes return []; don't pin that in the cache
+    if raw_jobs:
+        # Write to a temp file and rename so an interrupted run never leaves half a cache file
+        SCRAPE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(compress_json(raw_jobs))
+        os.replace(tmp_path, cache_path)
+
+    return raw_jobs
+
+
+async def test_scraper_single_page(db: Session):
+    """Test scraping a single career page"""
+    print("\n" + "="*60)
+    print("TEST 1: Single Page Scraping")
+    print("="*60)
+
+    # Create a test career page (or use existing one)
+    test_career_page = get_or_create_career_page(
+        db,
+        "https://jobs.ashbyhq.com/anthropic",  # Example career page
+        company_name="Test Company",
+        scrape_config={"multi_page": False},
+        is_active=True
+    )
+
+    # Shared scraper service
+    scraper = SCRAPER
+    print("✓ ScraperService ready")
+
+    # Scrape the career page
+    print(f"\nScraping URL: {test_career_page.url}")
+    raw_jobs = await cached_scrape(scraper, test_career_page, db)
+
+    # Display results
+    print(f"\n✓ Scraping completed!")
+    print(f"  - Found {len(raw_jobs)} raw job entries")
+    assert raw_jobs, "scrape returned no pages"
+
+    print("\n" + "-"*60)
+    print("Sample Raw Job Data:")
+    print("-"*60)
+    job = raw_jobs[0]
+    print(f"URL: {job.get('url')}")
+    print(f"Company: {job.get('company_name')}")
+    print(f"Career Page ID: {job.get('career_page_id')}")
+    print(f"Raw Content Length: {len(job.get('raw_content', ''))} chars")
+    print(f"HTML Content Length: {len(job.get('html_content', ''))} chars")
+    print(f"Scraped At: {job.get('scraped_at')}")
+    print(f"\nFirst 500 chars of content:")
+    print(job.get('raw_content', '')[:500])
+    print("-"*60)
+
+
+async def test_scraper_multi_page(db: Session):
     """Test crawling multiple pages"""
     print("\n" + "="*60)
     print("TEST 2: Multi-Page Crawling")
     print("="*60)
 
-    db = SessionLocal()
+    # Create a test career page with multi-page config (or use existing one)
+    test_career_page = get_or_create_career_page(
+        db,
+        "https://www.ycombinator.com/jobs",  # Example multi-page site
+        company_name="Multi-Page Test Company",
+        scrape_config={"multi_page": True, "page_limit": 3},
+        is_active=True
+    )
+
+    # Shared scraper service
+    scraper = SCRAPER
+    print("✓ ScraperService ready")
+
+    # Scrape the career page
+    print(f"\nCrawling URL: {test_career_page.url}")
+    print("Note: This may take a while for multi-page crawling...")
+    raw_jobs = await cached_scrape(scraper, test_career_page, db)
+
+    # Display results
+    print(f"\n✓ Crawling completed!")
+    print(f"  - Found {len(raw_jobs)} pages/entries")
+    assert raw_jobs, "crawl returned no pages"
+
+    print("\n" + "-"*60)
+    print("Pages Crawled:")
+    print("-"*60)
+    for idx, job in enumerate(raw_jobs[:5], 1):  # Show first 5
+        print(f"{idx}. URL: {job.get('url')}")
+        print(f"   Content Length: {len(job.get('raw_content', ''))} chars")
+    if len(raw_jobs) > 5:
+        print(f"... and {len(raw_jobs) - 5} more pages")
+    print("-"*60)
+
+
+async def run_test(test, *args) -> bool:
+    """Run one test outside pytest, reporting a failure instead of raising"""
     try:
-        # Create a test career page with multi-page config
-        test_career_page = CareerPage(
-            company_name="Multi-Page Test Company",
-            url="https://www.ycombinator.com/jobs",  # Example multi-page site
-            scrape_config={"multi_page": True, "page_limit": 3},
-            is_active=True
-        )
-
-        # Check if it already exists
-        existing = db.query(CareerPage).filter(CareerPage.url == test_career_page.url).first()
-        if existing:
-            test_career_page = existing
-            print(f"✓ Using existing career page: {test_career_page.company_name}")
-        else:
-            db.add(test_career_page)
-            db.commit()
-            db.refresh(test_career_page)
-            print(f"✓ Created new career page: {test_career_page.company_name}")
-
-        # Initialize scraper service
-        scraper = ScraperService()
-        print("✓ ScraperService initialized")
-
-        # Scrape the career page
-        print(f"\nCrawling URL: {test_career_page.url}")
-        print("Note: This may take a while for multi-page crawling...")
-        raw_jobs = await scraper.scrape_career_page(test_career_page, db)
-
-        # Display results
-        print(f"\n✓ Crawling completed!")
-        print(f"  - Found {len(raw_jobs)} pages/entries")
-
-        if raw_jobs:
-            print("\n" + "-"*60)
-            print("Pages Crawled:")
-            print("-"*60)
-            for idx, job in enumerate(raw_jobs[:5], 1):  # Show first 5
-                print(f"{idx}. URL: {job.get('url')}")
-                print(f"   Content Length: {len(job.get('raw_content', ''))} chars")
-            if len(raw_jobs) > 5:
-                print(f"... and {len(raw_jobs) - 5} more pages")
-            print("-"*60)
-
-        return True, raw_jobs
-
+        await test(*args)
+        return True
     except Exception as e:
         print(f"\n✗ Test failed: {str(e)}")
         import traceback
         traceback.print_exc()
-        return False, []
-    finally:
-        db.close()
+        return False
 
 
 async def main():
@@ -161,29 +212,37 @@ async def main():
     print("✓ Database connection configured")
     print("✓ Internet connection")
 
-    input("\nPress Enter to continue...")
+    # Only prompt a human; CI and piped runs go straight through
+    interactive = sys.stdin.isatty() and not os.getenv("JOBSCRAPER_NONINTERACTIVE")
+    if interactive:
+        input("\nPress Enter to continue...")
 
     # Initialize database
     print("\nInitializing database...")
     init_db()
     print("✓ Database initialized")
 
-    # Run tests
+    # Run tests (sharing one session, like the module-scoped pytest fixture)
     results = []
+    db = SessionLocal()
 
     # Test 1: Single page scraping
-    success1, raw_jobs1 = await test_scraper_single_page()
+    success1 = await run_test(test_scraper_single_page, db)
     results.append(("Single Page Scraping", success1))
 
     # Test 2: Multi-page crawling (optional, can be slow)
-    print("\n" + "="*60)
-    print("Multi-page crawling can be slow. Skip it? (y/n)")
-    skip = input().lower() == 'y'
+    skip = False
+    if interactive:
+        print("\n" + "="*60)
+        print("Multi-page crawling can be slow. Skip it? (y/n)")
+        skip = input().lower() == 'y'
 
     if not skip:
-        success2, raw_jobs2 = await test_scraper_multi_page()
+        success2 = await run_test(test_scraper_multi_page, db)
         results.append(("Multi-Page Crawling", success2))
 
+    db.close()
+
     # Summary
     print("\n" + "="*60)
     print("TEST SUMMARY")